@@ -1,7 +1,12 @@
-import streamlit as st
-import pandas as pd
-from streamlit_gsheets import GSheetsConnection
-import hashlib
+from startup import timed_import, eager_imports, render_startup_report
+
+with eager_imports():
+    import streamlit as st
+    import pandas as pd
+    import hashlib
+    from snapshots import SnapshotWarmer
+    from singleflight import SWRCache
+    from manifest_index import ManifestRouter
 
 # --- 1. INITIALIZATION & CONFIG ---
 # MUST be the first Streamlit command
@@ -14,12 +19,56 @@ if 'authenticated' not in st.session_state:
     st.session_state.user_clearance = 1
 
 # --- 2. DATABASE CONNECTION ---
-conn = st.connection("gsheets", type=GSheetsConnection)
+# Resolved on first use so pages that never touch the sheets skip the import
+@st.cache_resource
+def get_connection():
+    gsheets = timed_import("streamlit_gsheets")
+    return st.connection("gsheets", type=gsheets.GSheetsConnection)
+
+def read_worksheet(worksheet_name):
+    return get_connection().read(worksheet=worksheet_name, ttl=0)
+
+# New processes start from the last on-disk snapshot; see snapshots.py
+@st.cache_resource
+def get_snapshot_warmer():
+    return SnapshotWarmer(fetch=read_worksheet)
+
+# One cache per process shared by every session: concurrent misses for a
+# worksheet share one read, and expired entries keep being served while a
+# single background refresh runs (see singleflight.py)
+@st.cache_resource
+def get_sheet_cache():
+    warmer = get_snapshot_warmer()
+    cache = SWRCache(load=warmer.get, fresh_for=300)
+    warmer.on_refresh = cache.invalidate
+    return cache
+
+def write_worksheet(worksheet_name, df):
+    """Writes to the sheet, then makes the same frame the cached and snapshot copy."""
+    get_connection().update(worksheet=worksheet_name, data=df)
+    get_sheet_cache().put(worksheet_name, df.copy())
+    get_snapshot_warmer().store(worksheet_name, df)
+
+# Mission_Manifest compiled into an immutable index shared by every session;
+# it is only rebuilt when the manifest content hash changes (see manifest_index.py)
+@st.cache_resource
+def get_manifest_router():
+    return ManifestRouter()
+
+def get_manifest_index():
+    try:
+        # The cached frame itself, not a copy: the router recognises it by identity
+        # and only hashes the manifest again after the cache reloads it
+        manifest = get_sheet_cache().get("Mission_Manifest")
+    except Exception as e:
+        st.error(f"Error connecting to Mission_Manifest: {e}")
+        return get_manifest_router().index
+    return get_manifest_router().from_frame(manifest)
 
-@st.cache_data(ttl=300)
 def get_data(worksheet_name):
     try:
-        df = conn.read(worksheet=worksheet_name, ttl=0)
+        # Callers modify what they get back, so never hand out the cached frame itself
+        df = get_sheet_cache().get(worksheet_name).copy()
         if worksheet_name == "Node_Analytics":
             bool_cols = ['Blog_Read', 'Code_Done', 'Quiz_Done']
             for col in bool_cols:
@@ -62,8 +111,7 @@ def update_granular_progress(email, mission_id, node_id, column_to_flip, value):
             new_row[column_to_flip] = value
             all_progress = pd.concat([all_progress, pd.DataFrame([new_row])], ignore_index=True)
         
-        conn.update(worksheet="Node_Analytics", data=all_progress)
-        st.cache_data.clear()
+        write_worksheet("Node_Analytics", all_progress)
         st.toast(f"✅ {column_to_flip} synced!", icon="🛰️")
         st.rerun()
     except Exception as e:
@@ -77,8 +125,7 @@ def reset_granular_progress(email, node_id, column_to_reset):
         
         if mask.any():
             all_progress.loc[mask, column_to_reset] = False
-            conn.update(worksheet="Node_Analytics", data=all_progress)
-            st.cache_data.clear()
+            write_worksheet("Node_Analytics", all_progress)
             st.toast(f"Reset {column_to_reset}", icon="🔄")
             st.rerun()
     except Exception as e:
@@ -87,32 +134,31 @@ def reset_granular_progress(email, node_id, column_to_reset):
 # --- 5. RENDER FUNCTIONS ---
 def render_dynamic_navigator(email):
     """
-    Optimized renderer using a lookup dictionary to avoid repeated DF filtering.
+    Optimized renderer: mission order, titles and URLs come from the compiled
+    manifest index, progress from a lookup dictionary.
     """
-    manifest = get_data("Mission_Manifest")
+    index = get_manifest_index()
     analytics = get_data("Node_Analytics")
     
-    if manifest.empty:
+    if not len(index):
         st.warning("Mission Manifest is empty.")
         return
 
     # PERFORMANCE BOOST: Create a lookup dictionary {(email, node_id): {status_dict}}
     # This turns O(N^2) search into O(1) lookup
-    user_progress_map = (
-        analytics[analytics['Email'] == email]
-        .set_index('Node_ID')[['Blog_Read', 'Code_Done', 'Quiz_Done']]
-        .to_dict('index')
-    )
+    user_progress_map = {}
+    if not analytics.empty:
+        mine = analytics[analytics['Email'] == email]
+        user_progress_map = (
+            mine.set_index(mine['Node_ID'].astype(str))[['Blog_Read', 'Code_Done', 'Quiz_Done']]
+            .to_dict('index')
+        )
 
     st.subheader("📂 Mission Navigator")
-    missions = manifest['Mission_ID'].unique()
-    
-    for m_id in missions:
+    for m_id in index.missions():
         with st.expander(f"🎯 Protocol: {m_id}"):
-            nodes = manifest[manifest['Mission_ID'] == m_id].sort_values('Order')
-            
-            for _, node in nodes.iterrows():
-                n_id = str(node['Node_ID'])
+            for node in index.nodes(m_id):
+                n_id = node.node_id
                 unique_key = f"{m_id}_{n_id}"
                 
                 # Retrieve status from our pre-built map
@@ -123,8 +169,8 @@ def render_dynamic_navigator(email):
                 # Title Link
                 c1.markdown(f"""
                     <div style="margin-top: 5px;">
-                        <a href="{node['URL']}" target="_blank" style="text-decoration: none; color: #00f2ff; font-weight: 600;">
-                            {node['Node_Title']} <span style="font-size: 14px;">↗️</span>
+                        <a href="{node.url}" target="_blank" style="text-decoration: none; color: #00f2ff; font-weight: 600;">
+                            {node.title} <span style="font-size: 14px;">↗️</span>
                         </a>
                     </div>
                 """, unsafe_allow_html=True)
@@ -182,6 +228,7 @@ if target_mission:
     st.title(f"Mission: {target_mission}")
     if not is_logged_in:
         st.info("👋 Please log in to track your progress.")
+    render_startup_report()
     st.stop()
 
 else:
@@ -206,4 +253,6 @@ else:
     else:
         # Full Dashboard
         st.markdown(f"## Welcome Back, {st.session_state.user_name}")
-        render_dynamic_navigator(st.session_state.user_email)
\ No newline at end of file
+        render_dynamic_navigator(st.session_state.user_email)
+
+render_startup_report()
\ No newline at end of file
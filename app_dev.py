@@ -1,17 +1,75 @@
-import streamlit as st
-import pandas as pd
-from streamlit_gsheets import GSheetsConnection
-import hashlib
-from streamlit_local_storage import LocalStorage
-
-# Initialize Local Storage
-localS = LocalStorage()
+from startup import timed_import, eager_imports, render_startup_report
+
+with eager_imports():
+    import streamlit as st
+    import pandas as pd
+    import hashlib
+    import json
+    from concurrent.futures import ThreadPoolExecutor
+    from manifest_index import ManifestRouter
+
+# Local Storage is a browser component, so it is only loaded on the pages that
+# read or write it. LocalStorage reads the browser when its getAll component
+# renders, so it is rebuilt on every run (script globals reset each run); an
+# instance kept across runs would serve its first run's empty default forever.
+LOCAL_STORAGE_KEY = "storage_init"
+_local_storage = None
+_local_storage_mounted = False
+
+def get_local_storage():
+    global _local_storage, _local_storage_mounted
+    if _local_storage is None:
+        LocalStorage = timed_import("streamlit_local_storage").LocalStorage
+        _local_storage_mounted = LOCAL_STORAGE_KEY in st.session_state
+        _local_storage = LocalStorage(key=LOCAL_STORAGE_KEY)
+        if _local_storage_mounted:
+            # The constructor skips rendering once the key exists; render it so the items stay current
+            _local_storage.refreshItems()
+    return _local_storage
+
+def wait_for_local_storage():
+    """
+    On a session's first run the getAll component has not answered yet, so
+    every key looks missing. Stop that run once; the component's reply reruns
+    the script with the browser's real items.
+    """
+    get_local_storage()
+    if _local_storage_mounted or st.session_state.get('local_storage_waited'):
+        return
+    st.session_state.local_storage_waited = True
+    st.caption("🛰️ Loading your flight plan...")
+    st.stop()
 
 # --- DATABASE CONNECTION ---
-conn = st.connection("gsheets", type=GSheetsConnection)
+# Resolved on first use so pages that never touch the sheets skip the import
+@st.cache_resource
+def get_connection():
+    gsheets = timed_import("streamlit_gsheets")
+    return st.connection("gsheets", type=gsheets.GSheetsConnection)
+
+# Mission_Manifest compiled into an immutable index shared by every session;
+# it is only rebuilt when the manifest content hash changes (see manifest_index.py)
+@st.cache_resource
+def get_manifest_router():
+    return ManifestRouter()
+
+# One shared manifest frame per process, re-read at most every five minutes
+@st.cache_resource(ttl=300)
+def get_manifest():
+    return get_data("Mission_Manifest")
+
+def get_manifest_index():
+    try:
+        # The router recognises the shared frame by identity and only hashes
+        # the manifest again after it has been re-read
+        manifest = get_manifest()
+    except Exception as e:
+        st.error(f"Error connecting to Mission_Manifest: {e}")
+        return get_manifest_router().index
+    return get_manifest_router().from_frame(manifest)
 
 def get_data(worksheet_name):
-    df = conn.read(worksheet=worksheet_name, ttl=0)
+    df = get_connection().read(worksheet=worksheet_name, ttl=0)
     
     # If this is the progress sheet, fix the types immediately
     if worksheet_name == "Node_Analytics":
@@ -80,6 +138,141 @@ def get_cleaned_registry():
         st.error(f"Registry Access Denied: {e}")
         return pd.DataFrame()
 
+# --- CLIENT-SIDE PROGRESS CACHE ---
+# Returning pilots see their progress straight from browser local storage.
+# The sheets are read in a background thread after the page is drawn, and the
+# cache is corrected (one rerun) only if the server copy has a different
+# version stamp.
+PROGRESS_CACHE_KEY = "pilot_progress"
+PROGRESS_CACHE_SCHEMA = 2  # 2: node rows come from the server manifest, not the cache
+PROGRESS_COLS = ['Blog_Read', 'Code_Done', 'Quiz_Done']
+DEFAULT_MISSION_NODES = 5
+
+def _progress_version(payload):
+    body = {k: payload[k] for k in ("email", "progress", "active")}
+    return hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest()[:12]
+
+def build_progress_snapshot(email):
+    """Reads the sheets and returns the server copy of the pilot's progress."""
+    # Anonymous blog readers only need the roadmap, not anyone's progress
+    analytics = get_data("Node_Analytics") if email else pd.DataFrame()
+    missions = get_data("User_Missions") if email else pd.DataFrame()
+
+    progress = {}
+    if not analytics.empty:
+        mine = analytics[analytics['Email'] == email]
+        flags = mine[PROGRESS_COLS].astype(bool).values.tolist()
+        progress = dict(zip(mine['Node_ID'].astype(str).tolist(), flags))
+
+    active = None
+    if not missions.empty:
+        user_state = missions[missions['Email'] == email]
+        if not user_state.empty:
+            active = {
+                "Mission_ID": str(user_state['Mission_ID'].values[0]),
+                "Current_Node": int(user_state['Current_Node'].values[0]),
+                "Status": str(user_state['Status'].values[0]),
+            }
+
+    payload = {"schema": PROGRESS_CACHE_SCHEMA, "email": email,
+               "progress": progress, "active": active}
+    payload["version"] = _progress_version(payload)
+    return payload
+
+def load_cached_progress(email):
+    """Returns the cached payload for this pilot, or None if missing/foreign/outdated."""
+    if not email:
+        return None
+    # getAll only reports the browser's items when it mounts, so this session's
+    # own last write is the newer copy of what the browser holds
+    raw = st.session_state.get('progress_cache_written')
+    if raw is None:
+        wait_for_local_storage()
+        raw = get_local_storage().getItem(PROGRESS_CACHE_KEY)
+    try:
+        payload = json.loads(raw) if isinstance(raw, str) else raw
+    except ValueError:
+        return None
+    if not payload or payload.get("schema") != PROGRESS_CACHE_SCHEMA or payload.get("email") != email:
+        return None
+    return payload
+
+def save_cached_progress(payload, suffix=""):
+    payload["saved_at"] = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+    raw = json.dumps(payload)
+    st.session_state.progress_cache_written = raw
+    # The component key must be unique per run, so tie it to the version
+    get_local_storage().setItem(PROGRESS_CACHE_KEY, raw,
+                                key=f"set_{PROGRESS_CACHE_KEY}_{payload['version']}{suffix}")
+
+def patch_cached_progress(email, node_id, column, value):
+    """Applies a successful sheet write to the cached copy so the next load agrees."""
+    payload = load_cached_progress(email)
+    if payload is None:
+        return
+    flags = payload["progress"].setdefault(str(node_id), [False] * len(PROGRESS_COLS))
+    flags[PROGRESS_COLS.index(column)] = bool(value)
+    _save_patched_progress(payload)
+
+def patch_cached_mission(email, mission_id, current_node, status):
+    """Applies a User_Missions write to the cached active mission, like patch_cached_progress."""
+    payload = load_cached_progress(email)
+    if payload is None:
+        return
+    payload["active"] = {"Mission_ID": str(mission_id), "Current_Node": int(current_node), "Status": status}
+    _save_patched_progress(payload)
+
+def _save_patched_progress(payload):
+    payload["version"] = _progress_version(payload)
+    save_cached_progress(payload)
+    # A reconcile read still in flight started before this write and would
+    # bring the old values back; the next run starts one that sees it
+    st.session_state.pop('progress_reconcile', None)
+    # Callers rerun straight away, which can drop the browser write; repeat it next run
+    st.session_state.progress_cache_resync = True
+
+# Sheet reads for reconciliation run here, never in the script run that draws the page
+@st.cache_resource
+def get_reconcile_pool():
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="progress-reconcile")
+
+def reconcile_progress_cache(email, rendered):
+    """Call after drawing from the cached payload `rendered`; returns without waiting."""
+    if st.session_state.pop('progress_cache_resync', False):
+        # The run that wrote the cache was cut short by st.rerun(); write it again
+        save_cached_progress(rendered, suffix="_resync")
+    # Once per session is enough: the patch_cached_* helpers apply this session's own writes
+    if st.session_state.get('progress_reconciled') == email:
+        return
+    job = st.session_state.get('progress_reconcile')
+    if job is None or job[0] != email:
+        st.session_state.progress_reconcile = (email, get_reconcile_pool().submit(build_progress_snapshot, email))
+    apply_reconciled_progress(email, rendered)
+
+def _poll_every_second(fn):
+    # Fragments (Streamlit 1.37+) rerun on their own until the read lands; on older
+    # versions the finished read is applied on the pilot's next interaction instead
+    fragment = getattr(st, "fragment", None)
+    return fragment(run_every=1)(fn) if fragment is not None else fn
+
+@_poll_every_second
+def apply_reconciled_progress(email, rendered):
+    job = st.session_state.get('progress_reconcile')
+    if job is None or job[0] != email or not job[1].done():
+        return
+    del st.session_state['progress_reconcile']
+    try:
+        server = job[1].result()
+    except Exception:
+        return  # keep the cached copy; the next page load tries again
+    st.session_state.progress_reconciled = email
+    if rendered.get("version") == server["version"]:
+        return
+    # What the pilot saw was stale: store the server copy and redraw once from it
+    save_cached_progress(server)
+    st.session_state.progress_cache_resync = True
+    st.rerun()
+
 # --- MISSION LOGIC METHODS ---
 
 def update_granular_progress(email, mission_id, node_id, column_to_flip, value):
@@ -104,8 +297,9 @@ def update_granular_progress(email, mission_id, node_id, column_to_flip, value):
             new_data[column_to_flip] = value
             all_progress = pd.concat([all_progress, pd.DataFrame([new_data])], ignore_index=True)
         
-        conn.update(worksheet="Node_Analytics", data=all_progress)
+        get_connection().update(worksheet="Node_Analytics", data=all_progress)
         st.cache_data.clear()
+        patch_cached_progress(email, node_id, column_to_flip, value)
         st.success(f"Synced {column_to_flip}!")
     except Exception as e:
         st.error(f"Data Sync Error: {e}")
@@ -124,8 +318,9 @@ def reset_granular_progress(email, node_id, column_to_reset):
         
         if mask.any():
             all_progress.loc[mask, column_to_reset] = False
-            conn.update(worksheet="Node_Analytics", data=all_progress)
+            get_connection().update(worksheet="Node_Analytics", data=all_progress)
             st.cache_data.clear()
+            patch_cached_progress(email, node_id, column_to_reset, False)
             st.toast(f"Reset {column_to_reset} status.", icon="🔄")
     except Exception as e:
         st.error(f"Reset Error: {e}")
@@ -136,96 +331,85 @@ def complete_current_node(email, current_node, mission_id, total_nodes=5):
         mask = (all_missions['Email'] == email) & (all_missions['Mission_ID'] == mission_id)
         if mask.any():
             new_node = int(current_node) + 1
+            status = "Active" if new_node <= total_nodes else "Completed"
             if new_node <= total_nodes:
                 all_missions.loc[mask, 'Current_Node'] = new_node
                 all_missions.loc[mask, 'Last_Update'] = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
             else:
                 all_missions.loc[mask, 'Status'] = "Completed"
                 st.balloons()
-            conn.update(worksheet="User_Missions", data=all_missions)
+            get_connection().update(worksheet="User_Missions", data=all_missions)
             st.cache_data.clear()
+            # The dashboard draws from the cached payload, which is not reconciled again this session
+            patch_cached_mission(email, mission_id, new_node if status == "Active" else current_node, status)
             st.rerun()
     except Exception as e:
         st.error(f"Sync Error: {e}")
 
-def show_lms_roadmap(mission_id, email=None):
-    # Fetch Manifest (Uses your existing cache logic)
-    df = get_data("Mission_Manifest")
-    roadmap = df[df['Mission_ID'] == mission_id].sort_values('Order')
+def show_lms_roadmap(mission_id, payload):
+    # Nodes come from the shared manifest index, progress from the payload (cached or fresh)
+    roadmap = get_manifest_index().nodes(mission_id)
+    progress = payload["progress"]
 
-    if not roadmap.empty:
+    if roadmap:
         st.subheader(f"🚀 Mission: {mission_id}")
         
-        # Simple Progress Calculation
+        # Simple Progress Calculation: nodes in this mission marked 'Blog_Read'
         total = len(roadmap)
-        done = 0
-        if email:
-            # Check analytics for how many nodes in this mission are 'Blog_Read'
-            user_progress = get_data("Node_Analytics")
-            mission_nodes = roadmap['Node_ID'].astype(str).tolist()
-            done = user_progress[(user_progress['Email'] == email) & 
-                                 (user_progress['Node_ID'].isin(mission_nodes)) & 
-                                 (user_progress['Blog_Read'] == True)].shape[0]
+        done = sum(1 for n in roadmap if progress.get(n.node_id, [False])[0])
         
         st.progress(done / total if total > 0 else 0)
         st.write(f"Progress: {done}/{total} Lessons Complete")
         st.divider()
 
-        for _, node in roadmap.iterrows():
+        for node in roadmap:
             c1, c2 = st.columns([1, 8])
-            # Check if this specific node is done
-            is_done = False
-            if email:
-                node_status = user_progress[(user_progress['Email'] == email) & (user_progress['Node_ID'] == str(node['Node_ID']))]
-                is_done = node_status['Blog_Read'].values[0] if not node_status.empty else False
+            is_done = progress.get(node.node_id, [False])[0]
 
             c1.write("✅" if is_done else "⚪")
-            c2.markdown(f"**[{node['Node_Title']}]({node['URL']})**")
-            c2.caption(f"Lesson {node['Order']}")
+            c2.markdown(f"**[{node.title}]({node.url})**")
+            c2.caption(f"Lesson {node.order:g}")
     else:
         st.info("No roadmap found for this category.")
 
 
 # --- RENDER METHODS ---
 
-def render_active_mission(user_state):
-    email = user_state['Email'].values[0]
-    m_id = user_state['Mission_ID'].values[0]
-    curr_node = int(user_state['Current_Node'].values[0])
+def render_active_mission(email, active, index):
+    m_id = active['Mission_ID']
+    curr_node = int(active['Current_Node'])
     
     st.markdown(f"### 🛰️ Active Mission: {m_id}")
-    total_nodes = 5
-    st.progress(curr_node / total_nodes)
+    # The manifest is the source of truth; missions it does not list keep the old five-node plan
+    total_nodes = index.total_nodes(m_id) or DEFAULT_MISSION_NODES
+    st.progress(min(curr_node / total_nodes, 1.0))
     st.write(f"**Current Status:** Node {curr_node} of {total_nodes} Complete.")
+
+    briefing = index.node_at(m_id, curr_node)
+    if briefing:
+        st.info(f"👉 **Your Current Briefing:** [{briefing.title}]({briefing.url})")
     
     # Action Button
     if st.button("✅ Mark Node as Complete & Sync Progress", use_container_width=True):
         complete_current_node(email, curr_node, m_id, total_nodes)
 
-def render_dynamic_navigator(email):
-    manifest = get_data("Mission_Manifest")
-    analytics = get_data("Node_Analytics")
-    missions = manifest['Mission_ID'].unique()
+def render_dynamic_navigator(email, payload):
+    index = get_manifest_index()
     
     st.subheader("📂 Mission Navigator")
-    for m_id in missions:
+    for m_id in index.missions():
         with st.expander(f"🎯 Protocol: {m_id}"):
-            nodes = manifest[manifest['Mission_ID'] == m_id]
-            for _, node in nodes.iterrows():
-                n_id = node['Node_ID']
+            for node in index.nodes(m_id):
+                n_id = node.node_id
                 unique_key = f"{m_id}_{n_id}"
 
-                user_node_data = analytics[(analytics['Email'] == email) & (analytics['Node_ID'] == str(n_id))]
-                
-                has_read = user_node_data['Blog_Read'].values[0] if not user_node_data.empty else False
-                has_code = user_node_data['Code_Done'].values[0] if not user_node_data.empty else False
-                has_quiz = user_node_data['Quiz_Done'].values[0] if not user_node_data.empty else False
+                has_read, has_code, has_quiz = payload["progress"].get(n_id, [False, False, False])
 
                 c1, c2, c3, c4 = st.columns([0.5, 0.16, 0.16, 0.16])
                 c1.markdown(f"""
                     <div style="margin-top: 5px;">
-                        <a href="{node['URL']}" target="_blank" style="text-decoration: none; color: #00f2ff; font-weight: 600; display: flex; align-items: center; gap: 5px;">
-                            {node['Node_Title']} <span style="font-size: 14px;">↗️</span>
+                        <a href="{node.url}" target="_blank" style="text-decoration: none; color: #00f2ff; font-weight: 600; display: flex; align-items: center; gap: 5px;">
+                            {node.title} <span style="font-size: 14px;">↗️</span>
                         </a>
                     </div>
                 """, unsafe_allow_html=True)
@@ -283,12 +467,19 @@ if target_mission:
     handle_authentication() # Silent check
     user_email = st.session_state.get('user_email') or query_params.get("pilot_token")
     
-    show_lms_roadmap(target_mission, user_email)
+    cached_progress = load_cached_progress(user_email)
+    progress = cached_progress or build_progress_snapshot(user_email)
+    show_lms_roadmap(target_mission, progress)
+    if cached_progress is not None:
+        reconcile_progress_cache(user_email, cached_progress)
+    elif user_email:
+        save_cached_progress(progress)
     
     if not st.session_state.authenticated:
         st.info("👋 Log in to your Launchpad to track flight progress.")
     
     st.caption("© 2026 ProjectAIML | Mission Control v1.0.4")
+    render_startup_report()
     
     # Force the script to finish here
     st.stop() 
@@ -341,11 +532,12 @@ else:
             </style>
         """, unsafe_allow_html=True)
 
-        # Fetch Data for Dashboard
-        mission_data = get_data("User_Missions")
+        # Fetch Data for Dashboard: browser cache first, sheets only if it's empty
         user_name = st.session_state.get('user_name', 'Pilot')
         user_email = st.session_state.get('user_email', 'unknown')
         user_lvl = st.session_state.get('user_clearance', '1')
+        cached_progress = load_cached_progress(user_email)
+        progress = cached_progress or build_progress_snapshot(user_email)
 
         st.markdown(f"""
         <div style="background: linear-gradient(90deg, #0176D3 0%, #00A1E0 100%); padding: 40px; border-radius: 20px; color: white; margin-bottom: 20px;">
@@ -365,12 +557,19 @@ else:
                     st.rerun()
 
         # Active Mission Prompt
-        user_state = mission_data[mission_data['Email'] == user_email]
-        if not user_state.empty and user_state['Status'].values[0] == "Active":
-            render_active_mission(user_state)
+        active = progress["active"]
+        if active and active['Status'] == "Active":
+            render_active_mission(user_email, active, get_manifest_index())
         else:
             st.info("💡 Select a mission from the navigator below to begin your flight plan.")
 
         st.divider()
-        render_dynamic_navigator(user_email)
-        st.caption("© 2026 ProjectAIML | Mission Control v1.0.4")
\ No newline at end of file
+        render_dynamic_navigator(user_email, progress)
+        st.caption("© 2026 ProjectAIML | Mission Control v1.0.4")
+
+        # Only now, with the page drawn, check the cache against the sheets
+        if cached_progress is None:
+            save_cached_progress(progress)
+        else:
+            reconcile_progress_cache(user_email, cached_progress)
+        render_startup_report()
\ No newline at end of file
@@ -1,9 +1,13 @@
-import streamlit as st
-import pandas as pd
-from streamlit_gsheets import GSheetsConnection
-from faker import Faker
-import hashlib
-import random
+from startup import timed_import, eager_imports, render_startup_report
+
+with eager_imports():
+    import streamlit as st
+    import pandas as pd
+    import hashlib
+    from data_engine import generate_domain_data, generate_related_tables, GENERATION_MODES, RELATIONAL_SCHEMAS
+    from exporters import export_bundle, export_table, prepare_output, BUNDLE_FORMATS, TABLE_FORMATS
+    from user_import import prepare_bulk_import, REQUIRED_COLUMNS, ADMIN_CLEARANCE
+    from manifest_index import ManifestRouter
 
 # MISSION_MAP acts as our Content Delivery Router
 MISSION_CONTENT = {
@@ -19,6 +23,10 @@ MISSION_CONTENT = {
         # ... add more nodes as you build them
     }
 }
+# Planned length of each mission. MISSION_CONTENT can list fewer nodes while
+# lessons are still being written; progress and completion use the plan.
+MISSION_NODES = {"FOUNDATION": 5, "ARCHITECT": 5}
+DEFAULT_MISSION_NODES = 5
 
 # --- ARCHITECT'S UTILITIES ---
 def hash_password(password):
@@ -39,13 +47,26 @@ if 'authenticated' not in st.session_state:
     st.session_state.user_email = ""
 
 # --- DATABASE CONNECTION ---
-conn = st.connection("gsheets", type=GSheetsConnection)
+# Resolved on first use so pages that never touch the sheets skip the import
+@st.cache_resource
+def get_connection():
+    gsheets = timed_import("streamlit_gsheets")
+    return st.connection("gsheets", type=gsheets.GSheetsConnection)
+
+# MISSION_CONTENT compiled once per process into the same index app.py builds
+# from the Mission_Manifest sheet (see manifest_index.py)
+@st.cache_resource
+def get_manifest_router():
+    return ManifestRouter()
+
+def get_mission_index():
+    return get_manifest_router().from_mapping(MISSION_CONTENT)
 
 def start_mission(email, mission_id):
     """Creates a new record in the User_Missions worksheet to track progress."""
     try:
         # 1. Fetch current mission table
-        all_missions = conn.read(worksheet="User_Missions", ttl=0)
+        all_missions = get_connection().read(worksheet="User_Missions", ttl=0)
         
         # 2. Create the new mission record
         new_entry = pd.DataFrame([{
@@ -58,7 +79,7 @@ def start_mission(email, mission_id):
         
         # 3. Concatenate and Update Google Sheets
         updated_missions = pd.concat([all_missions, new_entry], ignore_index=True)
-        conn.update(worksheet="User_Missions", data=updated_missions)
+        get_connection().update(worksheet="User_Missions", data=updated_missions)
         
         # 4. Clear cache to reflect the new state and refresh UI
         st.cache_data.clear()
@@ -77,19 +98,20 @@ def render_active_mission(user_state):
     
     st.markdown(f"## 🛰️ Active Mission: {m_id}")
     
-    # Progress Calculation
-    total_nodes = 5
-    progress_val = curr_node / total_nodes
+    # Progress Calculation: the planned length, or more if more nodes are already published
+    index = get_mission_index()
+    total_nodes = max(MISSION_NODES.get(m_id, DEFAULT_MISSION_NODES), index.total_nodes(m_id))
+    progress_val = min(curr_node / total_nodes, 1.0)
     
     # UI Elements
     st.progress(progress_val)
     st.write(f"**Current Status:** Node {curr_node} of {total_nodes} Complete.")
     
     # Dynamic Link Generation
-    try:
-        current_url = MISSION_CONTENT[m_id][curr_node]
-        st.info(f"👉 **Your Current Briefing:** [Access Node {curr_node} Lesson]({current_url})")
-    except KeyError:
+    briefing = index.node_at(m_id, curr_node)
+    if briefing:
+        st.info(f"👉 **Your Current Briefing:** [Access Node {curr_node} Lesson]({briefing.url})")
+    else:
         st.warning("Flight Plan URL not found. Contact Command Center.")
 
     st.divider()
@@ -102,7 +124,7 @@ def render_active_mission(user_state):
 def complete_current_node(email, current_node, mission_id, total_nodes=5):
     """Update Layer: Increments progress for the specific Mission_ID."""
     try:
-        all_missions = conn.read(worksheet="User_Missions", ttl=0)
+        all_missions = get_connection().read(worksheet="User_Missions", ttl=0)
         
         # We look for the row matching BOTH Email and Mission_ID
         mask = (all_missions['Email'] == email) & (all_missions['Mission_ID'] == mission_id)
@@ -118,7 +140,7 @@ def complete_current_node(email, current_node, mission_id, total_nodes=5):
                 all_missions.loc[mask, 'Status'] = "Completed"
                 st.balloons()
             
-            conn.update(worksheet="User_Missions", data=all_missions)
+            get_connection().update(worksheet="User_Missions", data=all_missions)
             st.cache_data.clear()
             st.rerun()
             
@@ -138,7 +160,7 @@ with st.sidebar:
         if choice == "Login":
             if st.button("Authorize Entry"):
                 # 1. Fetch the latest registry (bypass cache)
-                registry = conn.read(worksheet="User_Registry", ttl=0)
+                registry = get_connection().read(worksheet="User_Registry", ttl=0)
                 
                 # 2. Standardize inputs
                 input_email = email.strip().lower()
@@ -155,6 +177,11 @@ with st.sidebar:
                         st.session_state.authenticated = True
                         st.session_state.user_email = input_email
                         st.session_state.user_name = user_row.iloc[0]['Full_Name']
+                        if 'Clearance' in user_row.columns:
+                            clearance = pd.to_numeric(user_row['Clearance'], errors='coerce').fillna(1).iloc[0]
+                            st.session_state.user_clearance = int(clearance)
+                        else:
+                            st.session_state.user_clearance = 1
                         
                         st.success(f"Welcome back, Pilot {st.session_state.user_name}!")
                         st.rerun() # Refresh to show the Launchpad
@@ -167,7 +194,7 @@ with st.sidebar:
             if st.button("Initialize Protocol"):
                 if email.strip() and password.strip() and name.strip():
                     # 1. Fetch existing registry to check for duplicates
-                    registry = conn.read(worksheet="User_Registry", ttl=0) # ttl=0 forces a fresh read
+                    registry = get_connection().read(worksheet="User_Registry", ttl=0) # ttl=0 forces a fresh read
                     
                     if email in registry['Email'].values:
                         st.error("This Email is already registered in the Launchpad.")
@@ -183,7 +210,7 @@ with st.sidebar:
                         
                         # 3. Append and Update
                         updated_registry = pd.concat([registry, new_user_data], ignore_index=True)
-                        conn.update(worksheet="User_Registry", data=updated_registry)
+                        get_connection().update(worksheet="User_Registry", data=updated_registry)
                         
                         # 4. CRITICAL: Clear cache so the next Login attempt sees this user
                         st.cache_data.clear()
@@ -195,14 +222,43 @@ with st.sidebar:
         st.write(f"Logged in as: **{st.session_state.user_email}**")
         if st.button("Log Out"):
             st.session_state.authenticated = False
+            st.session_state.user_clearance = 1
             st.rerun()
 
+        # Onboarding a whole class: one registry read, one batched write.
+        # Admins only; imported clearances are capped at the importer's own level.
+        if st.session_state.get('user_clearance', 1) >= ADMIN_CLEARANCE:
+            with st.expander("📦 Bulk Import Pilots (CSV)"):
+                st.caption(f"Columns: {', '.join(REQUIRED_COLUMNS)} (optional: Clearance)")
+                upload = st.file_uploader("Pilot roster", type="csv")
+                if upload is not None and st.button("Import Roster"):
+                    try:
+                        registry = get_connection().read(worksheet="User_Registry", ttl=0)
+                        new_rows, report = prepare_bulk_import(
+                            pd.read_csv(upload, dtype=str), registry,
+                            max_clearance=st.session_state.user_clearance)
+
+                        if not new_rows.empty:
+                            updated_registry = pd.concat([registry, new_rows], ignore_index=True)
+                            get_connection().update(worksheet="User_Registry", data=updated_registry)
+                            st.cache_data.clear()
+
+                        counts = report['Result'].value_counts()
+                        st.success(f"Created {counts.get('Created', 0)} · Skipped {counts.get('Skipped', 0)} · "
+                                   f"Rejected {counts.get('Rejected', 0)}")
+                        st.download_button("📥 Download Import Report", report.to_csv(index=False).encode('utf-8'),
+                                           file_name="pilot_import_report.csv", mime='text/csv')
+                    except ValueError as e:
+                        st.error(str(e))
+                    except Exception as e:
+                        st.error(f"Import Error: {e}")
+
 # --- MAIN LAUNCHPAD INTERFACE ---
 if st.session_state.authenticated:
     st.title("🚀 ProjectAIML Launchpad")
     
     # 1. Fetch User Progress from 'User_Missions'
-    mission_data = conn.read(worksheet="User_Missions", ttl=0)
+    mission_data = get_connection().read(worksheet="User_Missions", ttl=0)
     user_state = mission_data[mission_data['Email'] == st.session_state.user_email]
 
     if user_state.empty:
@@ -249,32 +305,8 @@ if st.session_state.authenticated:
 
 # --- CONFIGURATION ---
 # st.set_page_config(page_title="ProjectAIML Data Studio", layout="wide")
-fake = Faker()
-
-# --- BACKEND: DATA GENERATION ENGINE ---
-def generate_domain_data(domain, num_rows):
-    data = []
-    for _ in range(num_rows):
-        entry = {
-            "ID": fake.uuid4()[:8],
-            "Date": fake.date_this_year().strftime("%Y-%m-%d"),
-            "Client": fake.company()
-        }
-        if domain == "Insurance":
-            entry.update({
-                "Policy_Type": random.choice(["Life", "Auto", "Health", "Property"]),
-                "Claim_Amount": f"${random.randint(500, 50000)}",
-                "Status": random.choice(["Approved", "Pending", "Denied"])
-            })
-        elif domain == "Legal":
-            entry.update({
-                "Case_Type": random.choice(["Litigation", "Corporate", "Patent", "Family"]),
-                "Attorney": f"Esq. {fake.last_name()}",
-                "Filing_Status": random.choice(["Filed", "Discovery", "Settled", "Closed"])
-            })
-        # Add Healthcare/Retail blocks here as needed...
-        data.append(entry)
-    return pd.DataFrame(data)
+# The generation engine lives in data_engine.py (vectorized, seedable).
+# It imports Faker on the first generate and shares one instance per process.
 
 # --- UI & SUBMISSION LOGIC ---
 st.title("🚀 ProjectAIML.com | Data Studio")
@@ -285,6 +317,28 @@ with st.sidebar:
     st.header("Settings")
     industry = st.selectbox("Select Industry", ["Insurance", "Legal"])
     rows = st.slider("Number of Rows", 10, 500, 50)
+    gen_mode = st.selectbox("Data Shape", GENERATION_MODES,
+                            help="Flat: independent fields. Correlated: amounts/status depend on type. "
+                                 "Time Series: seasonal history per client.")
+    seed = st.number_input("Random Seed (0 = random)", min_value=0, value=0, step=1)
+    table_format = st.selectbox("Download Format", list(TABLE_FORMATS),
+                                format_func=lambda fmt: TABLE_FORMATS[fmt]["label"])
+
+    # Multi-table mode: Clients -> Policies -> Claims, Firms -> Attorneys -> Cases
+    relational = st.toggle("Related Tables Bundle", help="Generate linked tables with shared key columns.")
+    if relational:
+        schema = RELATIONAL_SCHEMAS[industry]
+        table_names = list(schema)
+        st.caption(" → ".join(table_names))
+        per_parent = {}
+        for child in table_names[1:]:
+            per_parent[child] = st.number_input(
+                f"Avg {child} per row of {schema[child]['parent']}",
+                # The engine guarantees min_per_parent children, so don't offer less
+                min_value=float(schema[child].get("min_per_parent", 0.1)),
+                value=float(schema[child]["per_parent"]), step=0.5
+            )
+        bundle_format = st.selectbox("Bundle Format", list(BUNDLE_FORMATS))
 
 # 2. Lead Capture Form
 with st.form("email_capture"):
@@ -299,29 +353,44 @@ if submitted:
         try:
             #conn = st.connection("gsheets", type=GSheetsConnection)
             # Read existing to append
-            existing_data = conn.read(ttl=0) 
+            existing_data = get_connection().read(ttl=0) 
             new_lead = pd.DataFrame([{
                 "Timestamp": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "Email": user_email,
                 "Industry": industry
             }])
             updated_df = pd.concat([existing_data, new_lead], ignore_index=True)
-            conn.update(data=updated_df)
+            get_connection().update(data=updated_df)
             
             # B. Generate the actual data
-            df_result = generate_domain_data(industry, rows)
+            if relational:
+                tables = generate_related_tables(industry, rows, per_parent=per_parent, seed=int(seed) or None)
+                st.success(f"Verified! Your {industry} bundle is ready: " +
+                           ", ".join(f"{name} ({len(df):,} rows)" for name, df in tables.items()))
+                for tab, (name, df) in zip(st.tabs(list(tables)), tables.items()):
+                    tab.dataframe(prepare_output(df.head(500)))
+
+                bundle, mime, ext = export_bundle(tables, bundle_format, schema)
+                st.download_button(
+                    label=f"📥 Download {bundle_format}",
+                    data=bundle,
+                    file_name=f"projectaiml_{industry.lower()}_bundle.{ext}",
+                    mime=mime,
+                )
+            else:
+                df_result = generate_domain_data(industry, rows, mode=gen_mode, seed=int(seed) or None)
             
-            st.success(f"Verified! Your {industry} dataset is ready.")
-            st.dataframe(df_result)
+                st.success(f"Verified! Your {industry} dataset is ready.")
+                st.dataframe(prepare_output(df_result))
             
-            # C. Provide Download Button
-            csv = df_result.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name=f"projectaiml_{industry.lower()}_data.csv",
-                mime='text/csv',
-            )
+                # C. Provide Download Button (formatting happens here, not in the engine)
+                payload, mime, ext = export_table(df_result, table_format)
+                st.download_button(
+                    label=f"📥 Download {TABLE_FORMATS[table_format]['label']}",
+                    data=payload,
+                    file_name=f"projectaiml_{industry.lower()}_data.{ext}",
+                    mime=mime,
+                )
         except Exception as e:
             st.error(f"Connection Error: {e}. Check your secrets.toml!")
     else:
@@ -331,4 +400,6 @@ if submitted:
 # --- PERSISTENCE ---
 # This ensures that even if the page refreshes, the data stays if they've already unlocked it.
 if 'unlocked' not in st.session_state:
-    st.info("Form submission is required to access the Data Engine.")
\ No newline at end of file
+    st.info("Form submission is required to access the Data Engine.")
+
+render_startup_report()
\ No newline at end of file
@@ -0,0 +1,391 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+from startup import timed_import
+
+# --- ENGINE SETTINGS ---
+# Faker is slow per call, so names are drawn once into a bounded pool and rows
+# sample indices from it. This keeps rows/sec flat regardless of dataset size.
+FAKER_POOL_SIZE = 1000
+GENERATION_MODES = ["Flat", "Correlated", "Time Series"]
+
+# --- COLUMN SPECS ---
+# Every domain is described as an ordered dict of column specs:
+#   "categorical": independent draw from choices (optional weights)
+#   "conditional": draw whose weights depend on an earlier "given" column
+#   "amount":      lognormal around a per-category median, scaled by factors
+#   "uniform_int": independent integer in [low, high]
+#   "faker":       sampled from a Faker provider pool, optional template
+#   "date":        day offset within a window, or "after" an earlier date column
+# Pass a dict of the same shape as `spec=` to plug in your own correlations;
+# "conditional" weights and "amount" medians must cover every "given" value.
+FLAT_SPECS = {
+    "Insurance": {
+        "Policy_Type": {"kind": "categorical", "choices": ["Life", "Auto", "Health", "Property"]},
+        "Claim_Amount": {"kind": "uniform_int", "low": 500, "high": 50000},
+        "Status": {"kind": "categorical", "choices": ["Approved", "Pending", "Denied"]},
+    },
+    "Legal": {
+        "Case_Type": {"kind": "categorical", "choices": ["Litigation", "Corporate", "Patent", "Family"]},
+        "Attorney": {"kind": "faker", "provider": "last_name", "template": "Esq. {}"},
+        "Filing_Status": {"kind": "categorical", "choices": ["Filed", "Discovery", "Settled", "Closed"]},
+    },
+}
+
+CORRELATION_SPECS = {
+    "Insurance": {
+        "Policy_Type": {
+            "kind": "categorical",
+            "choices": ["Life", "Auto", "Health", "Property"],
+            "weights": [0.15, 0.40, 0.30, 0.15],
+        },
+        "Status": {
+            "kind": "conditional",
+            "given": "Policy_Type",
+            "choices": ["Approved", "Pending", "Denied"],
+            "weights": {
+                "Life": [0.55, 0.30, 0.15],
+                "Auto": [0.70, 0.20, 0.10],
+                "Health": [0.65, 0.20, 0.15],
+                "Property": [0.45, 0.30, 0.25],
+            },
+        },
+        "Claim_Amount": {
+            "kind": "amount",
+            "given": "Policy_Type",
+            "median": {"Life": 18000, "Auto": 4500, "Health": 3000, "Property": 12000},
+            # Big claims get scrutinised longer and refused more often
+            "factors": {"Status": {"Approved": 1.0, "Pending": 1.3, "Denied": 1.8}},
+            "sigma": 0.6,
+            "clip": (500, 50000),
+        },
+    },
+    "Legal": {
+        "Case_Type": {
+            "kind": "categorical",
+            "choices": ["Litigation", "Corporate", "Patent", "Family"],
+            "weights": [0.35, 0.30, 0.10, 0.25],
+        },
+        "Attorney": {"kind": "faker", "provider": "last_name", "template": "Esq. {}"},
+        "Filing_Status": {
+            "kind": "conditional",
+            "given": "Case_Type",
+            "choices": ["Filed", "Discovery", "Settled", "Closed"],
+            "weights": {
+                "Litigation": [0.20, 0.40, 0.25, 0.15],
+                "Corporate": [0.30, 0.10, 0.20, 0.40],
+                "Patent": [0.35, 0.35, 0.15, 0.15],
+                "Family": [0.25, 0.15, 0.40, 0.20],
+            },
+        },
+    },
+}
+
+# --- RELATIONAL SCHEMAS ---
+# Tables are listed parent-first. Every table gets an int64 "key"; a child names
+# its "parent" and the mean rows per parent ("per_parent", at least
+# "min_per_parent"). Child foreign keys come from one np.repeat over per-parent
+# Poisson counts, so parent tables are never scanned row by row. "inherit"
+# copies parent columns into the child (kept), "context" copies them only so
+# specs can condition on them (dropped afterwards).
+RELATIONAL_SCHEMAS = {
+    "Insurance": {
+        "Clients": {
+            "key": "Client_ID",
+            "columns": {
+                "Client": {"kind": "faker", "provider": "company"},
+                "Segment": {"kind": "categorical", "choices": ["Retail", "SME", "Corporate"], "weights": [0.6, 0.3, 0.1]},
+                "State": {"kind": "faker", "provider": "state_abbr"},
+            },
+        },
+        "Policies": {
+            "key": "Policy_ID",
+            "parent": "Clients",
+            "per_parent": 2.0,
+            "min_per_parent": 1,
+            "columns": {
+                "Policy_Type": CORRELATION_SPECS["Insurance"]["Policy_Type"],
+                "Start_Date": {"kind": "date", "within_days": 3 * 365},
+                "Annual_Premium": {
+                    "kind": "amount",
+                    "given": "Policy_Type",
+                    "median": {"Life": 900, "Auto": 1400, "Health": 2400, "Property": 1100},
+                    "sigma": 0.35,
+                    "clip": (100, 20000),
+                },
+            },
+        },
+        "Claims": {
+            "key": "Claim_ID",
+            "parent": "Policies",
+            "per_parent": 1.2,
+            "inherit": ["Client_ID"],
+            "context": ["Policy_Type", "Start_Date"],
+            "columns": {
+                "Date": {"kind": "date", "after": "Start_Date", "within_days": 3 * 365},
+                "Status": CORRELATION_SPECS["Insurance"]["Status"],
+                "Claim_Amount": CORRELATION_SPECS["Insurance"]["Claim_Amount"],
+            },
+        },
+    },
+    "Legal": {
+        "Firms": {
+            "key": "Firm_ID",
+            "columns": {
+                "Firm": {"kind": "faker", "provider": "company", "template": "{} LLP"},
+                "City": {"kind": "faker", "provider": "city"},
+            },
+        },
+        "Attorneys": {
+            "key": "Attorney_ID",
+            "parent": "Firms",
+            "per_parent": 8.0,
+            "min_per_parent": 1,
+            "columns": {
+                "Attorney": {"kind": "faker", "provider": "last_name", "template": "Esq. {}"},
+                "Practice_Area": CORRELATION_SPECS["Legal"]["Case_Type"],
+            },
+        },
+        "Cases": {
+            "key": "Case_ID",
+            "parent": "Attorneys",
+            "per_parent": 12.0,
+            "inherit": ["Firm_ID"],
+            "context": ["Practice_Area"],
+            "columns": {
+                # Attorneys mostly take cases in their own practice area
+                "Case_Type": {
+                    "kind": "conditional",
+                    "given": "Practice_Area",
+                    "choices": ["Litigation", "Corporate", "Patent", "Family"],
+                    "weights": {
+                        "Litigation": [0.85, 0.05, 0.05, 0.05],
+                        "Corporate": [0.05, 0.85, 0.05, 0.05],
+                        "Patent": [0.05, 0.05, 0.85, 0.05],
+                        "Family": [0.05, 0.05, 0.05, 0.85],
+                    },
+                },
+                "Filing_Date": {"kind": "date", "within_days": 2 * 365},
+                "Filing_Status": CORRELATION_SPECS["Legal"]["Filing_Status"],
+            },
+        },
+    },
+}
+
+# Monthly intensity for Time Series mode: 1 + amplitude * cos(distance to peak)
+SEASONALITY = {
+    "Insurance": {"peak_month": 1, "amplitude": 0.45},   # winter storms & accidents
+    "Legal": {"peak_month": 10, "amplitude": 0.25},      # Q4 filing deadlines
+}
+
+# --- POOLS & PRIMITIVES ---
+# Faker costs ~150ms to import and ~30ms to build its first instance, so it is
+# only loaded when a dataset is actually generated
+@functools.lru_cache(maxsize=1)
+def get_faker():
+    """Shared unseeded Faker, built once per process."""
+    return timed_import("faker").Faker()
+
+def _make_faker(seed):
+    if seed is None:
+        return get_faker()
+    # Seeded runs get their own instance so concurrent requests stay reproducible
+    fake = timed_import("faker").Faker()
+    fake.seed_instance(seed)
+    return fake
+
+def faker_pool(fake, provider, size=FAKER_POOL_SIZE):
+    """Draws `size` values from a Faker provider once, for vectorized sampling."""
+    make = getattr(fake, provider)
+    return np.array([make() for _ in range(size)], dtype=object)
+
+def _pool_categorical(pool, picks, template=None):
+    """Categorical of pool[picks]; the template is applied once per distinct value, not per row."""
+    categories, codes = np.unique(pool, return_inverse=True)
+    if template:
+        categories = [template.format(v) for v in categories]
+    return pd.Categorical.from_codes(codes[picks], categories=categories)
+
+def _random_ids(rng, n):
+    # Fixed-width 32-bit IDs; exporters render them as 8 hex characters
+    return rng.integers(0, 2**32, size=n, dtype=np.uint32)
+
+def _sample_codes(rng, n_choices, n, weights=None):
+    p = None if weights is None else np.asarray(weights, dtype=float) / np.sum(weights)
+    return rng.choice(n_choices, size=n, p=p).astype(np.int16)
+
+def _given_values(column):
+    """Every value a "given" column can take: its categories, or the values present."""
+    values = pd.Series(column)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.categories.tolist()
+    return values.dropna().unique().tolist()
+
+def _check_covers(col_spec, key, frame):
+    """A conditional spec must map every value of its given column; a gap would yield NaN rows."""
+    missing = [v for v in _given_values(frame[col_spec["given"]]) if v not in col_spec[key]]
+    if missing:
+        raise ValueError(f"{col_spec['kind']} spec on {col_spec['given']} has no {key} for: "
+                         + ", ".join(map(str, missing)))
+
+def _sample_column(rng, fake, col_spec, frame, n):
+    kind = col_spec["kind"]
+    if kind == "categorical":
+        codes = _sample_codes(rng, len(col_spec["choices"]), n, col_spec.get("weights"))
+        return pd.Categorical.from_codes(codes, categories=col_spec["choices"])
+
+    if kind == "conditional":
+        _check_covers(col_spec, "weights", frame)
+        parent = frame[col_spec["given"]]
+        codes = np.full(n, -1, dtype=np.int16)
+        # One vectorized draw per parent category instead of one per row
+        for parent_value, weights in col_spec["weights"].items():
+            mask = np.asarray(parent == parent_value)
+            codes[mask] = _sample_codes(rng, len(col_spec["choices"]), int(mask.sum()), weights)
+        return pd.Categorical.from_codes(codes, categories=col_spec["choices"])
+
+    if kind == "amount":
+        _check_covers(col_spec, "median", frame)
+        median = pd.Series(frame[col_spec["given"]]).map(col_spec["median"]).to_numpy(dtype=float)
+        for factor_col, factor_map in col_spec.get("factors", {}).items():
+            median = median * pd.Series(frame[factor_col]).map(factor_map).fillna(1.0).to_numpy(dtype=float)
+        amounts = median * rng.lognormal(0.0, col_spec.get("sigma", 0.5), size=n)
+        low, high = col_spec.get("clip", (0, np.inf))
+        return np.clip(np.round(amounts), low, high).astype(np.int64)
+
+    if kind == "uniform_int":
+        return rng.integers(col_spec["low"], col_spec["high"] + 1, size=n)
+
+    if kind == "faker":
+        pool = faker_pool(fake, col_spec["provider"], max(1, min(n, FAKER_POOL_SIZE)))
+        return _pool_categorical(pool, rng.integers(0, len(pool), size=n), col_spec.get("template"))
+
+    if kind == "date":
+        # Either "after" an earlier date column (e.g. claim after policy start)
+        # or within the trailing `within_days`, never in the future
+        today = pd.Timestamp.today().normalize()
+        within = col_spec.get("within_days", 365)
+        if "after" in col_spec:
+            start = pd.DatetimeIndex(frame[col_spec["after"]])
+        else:
+            start = pd.DatetimeIndex(np.full(n, today - pd.Timedelta(days=within)))
+        span = np.minimum((today - start).days.to_numpy(), within)
+        offsets = np.floor(rng.random(n) * (np.maximum(span, 0) + 1)).astype(np.int64)
+        return (start + pd.to_timedelta(offsets, unit="D")).to_numpy()
+
+    raise ValueError(f"Unknown column kind: {kind}")
+
+def _apply_spec(rng, fake, spec, frame, n):
+    for col_name, col_spec in spec.items():
+        frame[col_name] = _sample_column(rng, fake, col_spec, frame, n)
+    return frame
+
+def _this_year_dates(rng, n):
+    today = pd.Timestamp.today().normalize()
+    start = today.replace(month=1, day=1)
+    offsets = rng.integers(0, (today - start).days + 1, size=n)
+    return start + pd.to_timedelta(offsets, unit="D")
+
+def _seasonal_dates(rng, n, peak_month, amplitude, months=12):
+    """Draws dates over the trailing `months`, weighted by a cosine seasonal curve."""
+    today = pd.Timestamp.today().normalize()
+    month_starts = pd.date_range(end=today.replace(day=1), periods=months, freq="MS")
+    intensity = 1 + amplitude * np.cos(2 * np.pi * (np.asarray(month_starts.month) - peak_month) / 12)
+    picked = month_starts[rng.choice(months, size=n, p=intensity / intensity.sum())]
+    days_in_month = np.asarray(picked.days_in_month)
+    # Don't hand out dates in the future for the current month
+    days_in_month = np.where(picked == month_starts[-1], today.day, days_in_month)
+    offsets = np.floor(rng.random(n) * days_in_month).astype(np.int64)
+    return picked + pd.to_timedelta(offsets, unit="D")
+
+# --- PUBLIC API ---
+def generate_domain_data(domain, num_rows, mode="Flat", seed=None, spec=None, n_clients=None):
+    """
+    Generates a synthetic dataset for `domain`, fully vectorized.
+
+    mode="Flat" draws every field independently (the original behaviour),
+    "Correlated" uses CORRELATION_SPECS (or `spec`) for conditional fields and
+    "Time Series" additionally spreads rows across a fixed set of clients with
+    a seasonal date profile, sorted per client.
+
+    Columns stay natively typed (uint32 ID, datetime64 dates, int64 amounts,
+    categorical text); use exporters.export_table to render a download.
+    """
+    if mode not in GENERATION_MODES:
+        raise ValueError(f"Unknown generation mode: {mode}")
+    if spec is None:
+        spec = (FLAT_SPECS if mode == "Flat" else CORRELATION_SPECS).get(domain, {})
+
+    rng = np.random.default_rng(seed)
+    fake = _make_faker(seed)
+    n = int(num_rows)
+    frame = {"ID": _random_ids(rng, n)}
+
+    if mode == "Time Series":
+        n_clients = n_clients or max(1, min(n // 20, FAKER_POOL_SIZE))
+        clients = faker_pool(fake, "company", n_clients)
+        # Gamma-distributed activity so a few clients claim a lot, most claim rarely
+        activity = rng.gamma(shape=1.5, scale=1.0, size=n_clients)
+        season = SEASONALITY.get(domain, {"peak_month": 1, "amplitude": 0.0})
+        frame["Date"] = _seasonal_dates(rng, n, season["peak_month"], season["amplitude"])
+        frame["Client"] = _pool_categorical(clients, rng.choice(n_clients, size=n, p=activity / activity.sum()))
+    else:
+        frame["Date"] = _this_year_dates(rng, n)
+        clients = faker_pool(fake, "company", max(1, min(n, FAKER_POOL_SIZE)))
+        frame["Client"] = _pool_categorical(clients, rng.integers(0, len(clients), size=n))
+
+    frame = _apply_spec(rng, fake, spec, frame, n)
+    df = pd.DataFrame(frame)
+    if mode == "Time Series":
+        df = df.sort_values(["Client", "Date"], kind="stable", ignore_index=True)
+    return df
+
+def _child_counts(rng, n_parents, table_spec, per_parent):
+    mean = per_parent if per_parent is not None else table_spec.get("per_parent", 1.0)
+    floor = table_spec.get("min_per_parent", 0)
+    return floor + rng.poisson(max(mean - floor, 0.0), size=n_parents)
+
+def generate_related_tables(domain, num_roots, per_parent=None, seed=None, schema=None):
+    """
+    Generates every table of a relational schema in one pass, parent-first.
+
+    `num_roots` sizes the top-level table; `per_parent` optionally overrides
+    the mean children per parent, e.g. {"Policies": 3, "Claims": 0.5}.
+    Returns an ordered dict of {table_name: DataFrame} sharing key columns.
+    """
+    schema = schema or RELATIONAL_SCHEMAS.get(domain)
+    if not schema:
+        raise ValueError(f"No relational schema for domain: {domain}")
+    per_parent = per_parent or {}
+    for table_name, mean in per_parent.items():
+        floor = schema.get(table_name, {}).get("min_per_parent", 0)
+        if mean is not None and mean < floor:
+            raise ValueError(f"{table_name} needs at least {floor} per parent row, got {mean}")
+
+    rng = np.random.default_rng(seed)
+    fake = _make_faker(seed)
+    tables = {}
+    for table_name, table_spec in schema.items():
+        frame = {}
+        parent_name = table_spec.get("parent")
+        if parent_name is None:
+            n = int(num_roots)
+        else:
+            parent = tables[parent_name]
+            counts = _child_counts(rng, len(parent), table_spec, per_parent.get(table_name))
+            # Row positions into the parent: [0, 0, 1, 2, 2, 2, ...]
+            parent_pos = np.repeat(np.arange(len(parent)), counts)
+            n = len(parent_pos)
+            parent_key = schema[parent_name]["key"]
+            frame[parent_key] = parent[parent_key].to_numpy()[parent_pos]
+            for col in table_spec.get("inherit", []) + table_spec.get("context", []):
+                frame[col] = parent[col].array.take(parent_pos)
+
+        frame = {table_spec["key"]: np.arange(1, n + 1, dtype=np.int64), **frame}
+        frame = _apply_spec(rng, fake, table_spec["columns"], frame, n)
+        for col in table_spec.get("context", []):
+            frame.pop(col, None)
+        tables[table_name] = pd.DataFrame(frame)
+    return tables
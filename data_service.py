@@ -0,0 +1,170 @@
+"""
+Headless access to the data engine, without Streamlit.
+
+    python data_service.py generate --domain Insurance --rows 1000000 --seed 7 > claims.csv
+    python data_service.py serve --port 8765 --workers 8
+    curl "http://localhost:8765/generate?domain=Legal&rows=50000&format=jsonl"
+"""
+import argparse
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from data_engine import CORRELATION_SPECS, GENERATION_MODES, generate_domain_data
+from exporters import STREAM_FORMATS, encode_chunk
+
+# --- SETTINGS ---
+CHUNK_ROWS = 50_000
+MAX_ROWS = 10_000_000
+DOMAINS = list(CORRELATION_SPECS)
+
+# --- STREAMING GENERATOR ---
+def _chunk_seed(seed, index):
+    # Independent but reproducible stream per chunk: same seed -> same bytes
+    if seed is None:
+        return None
+    return int(np.random.SeedSequence([seed, index]).generate_state(1)[0])
+
+def validate_request(domain, rows, mode, fmt, seed=None):
+    """Raises ValueError with a user-facing message for a bad request."""
+    if domain not in DOMAINS:
+        raise ValueError(f"domain must be one of {DOMAINS}")
+    if not 1 <= rows <= MAX_ROWS:
+        raise ValueError(f"rows must be between 1 and {MAX_ROWS:,}")
+    if mode not in GENERATION_MODES:
+        raise ValueError(f"mode must be one of {GENERATION_MODES}")
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"format must be one of {list(STREAM_FORMATS)}")
+    if seed is not None and seed < 0:
+        raise ValueError("seed must be a non-negative integer")
+
+def stream_dataset(domain, rows, mode="Flat", seed=None, fmt="csv", chunk_rows=CHUNK_ROWS):
+    """
+    Yields the encoded dataset in chunks of `chunk_rows` so memory stays flat.
+    In Time Series mode every chunk is a self-contained cohort of clients.
+    """
+    validate_request(domain, rows, mode, fmt, seed)
+    for index, start in enumerate(range(0, rows, chunk_rows)):
+        n = min(chunk_rows, rows - start)
+        df = generate_domain_data(domain, n, mode=mode, seed=_chunk_seed(seed, index))
+        yield encode_chunk(df, fmt, first=(index == 0))
+
+# --- HTTP API ---
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that hands each connection to a fixed-size worker pool."""
+    daemon_threads = True
+
+    def __init__(self, address, handler, workers):
+        super().__init__(address, handler)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="datagen")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._work, request, client_address)
+
+    def _work(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+class DataRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self._send_json(200, {"status": "ok"})
+        if url.path == "/domains":
+            return self._send_json(200, {"domains": DOMAINS, "modes": GENERATION_MODES,
+                                         "formats": list(STREAM_FORMATS), "max_rows": MAX_ROWS})
+        if url.path != "/generate":
+            return self._send_json(404, {"error": f"Unknown endpoint: {url.path}"})
+
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            domain = query.get("domain", "Insurance")
+            rows = int(query.get("rows", 1000))
+            mode = query.get("mode", "Flat")
+            fmt = query.get("format", "csv")
+            seed = int(query["seed"]) if query.get("seed") else None
+            validate_request(domain, rows, mode, fmt, seed)
+        except ValueError as e:
+            return self._send_json(400, {"error": str(e)})
+
+        self.send_response(200)
+        self.send_header("Content-Type", STREAM_FORMATS[fmt])
+        self.send_header("Content-Disposition", f'attachment; filename="projectaiml_{domain.lower()}_data.{fmt}"')
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in stream_dataset(domain, rows, mode, seed, fmt):
+            self.wfile.write(f"{len(chunk):X}\r\n".encode("ascii") + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+def serve(host="127.0.0.1", port=8765, workers=8):
+    server = PooledHTTPServer((host, port), DataRequestHandler, workers)
+    print(f"Data service listening on http://{host}:{port} with {workers} workers", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ProjectAIML synthetic data generator")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="Write a dataset to a file or stdout")
+    gen.add_argument("--domain", default="Insurance", choices=DOMAINS)
+    gen.add_argument("--rows", type=int, default=1000)
+    gen.add_argument("--mode", default="Flat", choices=GENERATION_MODES)
+    gen.add_argument("--seed", type=int, default=None)
+    gen.add_argument("--format", dest="fmt", default="csv", choices=list(STREAM_FORMATS))
+    gen.add_argument("--output", "-o", default="-", help="File path, or - for stdout")
+
+    srv = sub.add_parser("serve", help="Run the local HTTP API")
+    srv.add_argument("--host", default="127.0.0.1")
+    srv.add_argument("--port", type=int, default=8765)
+    srv.add_argument("--workers", type=int, default=8)
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve(args.host, args.port, args.workers)
+        return 0
+
+    try:
+        # stream_dataset is lazy, so check the arguments before any file is created or truncated
+        validate_request(args.domain, args.rows, args.mode, args.fmt, args.seed)
+        chunks = stream_dataset(args.domain, args.rows, args.mode, args.seed, args.fmt)
+        if args.output == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+        else:
+            with open(args.output, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+    except ValueError as e:
+        parser.error(str(e))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import binascii
+import io
+import sqlite3
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from startup import timed_import
+
+# --- OUTPUT STAGE ---
+# The engine hands over natively typed columns. This is the only place they
+# become text, and always a whole column at a time.
+CURRENCY_COLUMNS = ["Claim_Amount"]  # "$1234" in CSV downloads, as the Data Studio always shipped them
+
+def format_ids(values):
+    """uint32 IDs -> 8-char lowercase hex, with one hexlify over the whole buffer."""
+    raw = binascii.hexlify(np.ascontiguousarray(values, dtype=">u4").tobytes())
+    return np.frombuffer(raw, dtype="S8").astype(str)
+
+def _format_distinct(values, render):
+    """Renders each distinct value once and broadcasts back; missing values stay None."""
+    codes, uniques = pd.factorize(values)
+    rendered = np.empty(len(uniques) + 1, dtype=object)
+    rendered[:-1] = render(np.asarray(uniques))
+    return rendered[codes]  # code -1 (missing) picks the trailing None
+
+def prepare_output(df, text=False, currency=False):
+    """
+    Renders typed columns for an output target. IDs always become hex; with
+    text=True dates become ISO strings, with currency=True CURRENCY_COLUMNS
+    get a "$" prefix. Everything else is passed through untouched.
+    """
+    out = {}
+    for col in df.columns:
+        values = df[col]
+        if values.dtype == np.uint32:
+            out[col] = format_ids(values.to_numpy())
+        elif text and pd.api.types.is_datetime64_dtype(values.dtype):
+            out[col] = _format_distinct(values.to_numpy(), lambda u: np.datetime_as_string(u.astype("datetime64[D]")))
+        elif currency and col in CURRENCY_COLUMNS and pd.api.types.is_integer_dtype(values.dtype):
+            out[col] = _format_distinct(values.to_numpy(), lambda u: np.char.add("$", u.astype(str)))
+        else:
+            out[col] = values.array
+    return pd.DataFrame(out)
+
+def _csv_bytes(df, header=True):
+    """CSV via pyarrow's C++ writer when present (several times faster than to_csv)."""
+    try:
+        pa = timed_import("pyarrow")
+        pa_csv = timed_import("pyarrow.csv")
+    except ImportError:
+        return df.to_csv(index=False, header=header).encode("utf-8")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # The CSV writer wants plain columns, so decode dictionary (categorical) ones
+    table = table.cast(pa.schema([
+        pa.field(f.name, f.type.value_type if pa.types.is_dictionary(f.type) else f.type) for f in table.schema
+    ]))
+    buffer = io.BytesIO()
+    pa_csv.write_csv(table, buffer, pa_csv.WriteOptions(include_header=header))
+    return buffer.getvalue()
+
+def _require(module, purpose):
+    try:
+        __import__(module)
+    except ImportError as e:
+        raise ImportError(f"{purpose} needs {module}: pip install {module}") from e
+
+# --- SINGLE-TABLE EXPORT ---
+TABLE_FORMATS = {
+    "csv": {"label": "CSV", "ext": "csv", "mime": "text/csv", "stream": True},
+    "jsonl": {"label": "JSON Lines", "ext": "jsonl", "mime": "application/x-ndjson", "stream": True},
+    "parquet": {"label": "Parquet", "ext": "parquet", "mime": "application/vnd.apache.parquet", "stream": False},
+    "xlsx": {"label": "Excel", "ext": "xlsx",
+             "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "stream": False},
+}
+EXCEL_MAX_ROWS = 1_048_575  # one row of the sheet limit goes to the header
+
+def encode_table(df, fmt, header=True):
+    """Encodes one typed frame as `fmt` (a TABLE_FORMATS key) and returns bytes."""
+    if fmt == "csv":
+        return _csv_bytes(prepare_output(df, text=True, currency=True), header)
+    if fmt == "jsonl":
+        return prepare_output(df, text=True).to_json(orient="records", lines=True).encode("utf-8")
+    if fmt == "parquet":
+        _require("pyarrow", "Parquet export")
+        return prepare_output(df).to_parquet(index=False)
+    if fmt == "xlsx":
+        _require("openpyxl", "Excel export")
+        if len(df) > EXCEL_MAX_ROWS:
+            raise ValueError(f"Excel holds at most {EXCEL_MAX_ROWS:,} rows; pick CSV or Parquet instead")
+        buffer = io.BytesIO()
+        prepare_output(df).to_excel(buffer, index=False)
+        return buffer.getvalue()
+    raise ValueError(f"Unknown table format: {fmt}")
+
+def export_table(df, fmt):
+    """Returns (bytes, mime, file_extension) for the chosen table format."""
+    data = encode_table(df, fmt)
+    info = TABLE_FORMATS[fmt]
+    return data, info["mime"], info["ext"]
+
+# --- BUNDLE EXPORT ---
+# Related tables are shipped together so their keys stay consistent.
+# Each writer takes {table_name: DataFrame} and returns raw bytes.
+BUNDLE_FORMATS = {
+    "ZIP of CSVs": {"ext": "zip", "mime": "application/zip"},
+    "SQLite Database": {"ext": "sqlite", "mime": "application/vnd.sqlite3"},
+    "ZIP of Parquet": {"ext": "zip", "mime": "application/zip"},
+}
+
+def bundle_zip_csv(tables):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, df in tables.items():
+            # Same rendering as the single-table CSV download ("$" amounts included)
+            zf.writestr(f"{name.lower()}.csv", _csv_bytes(prepare_output(df, text=True, currency=True)))
+    return buffer.getvalue()
+
+def bundle_sqlite(tables, schema=None):
+    """
+    Writes all tables into one in-memory SQLite DB and returns its file image.
+    Amounts stay numeric here (no "$") so they can be summed in SQL.
+    """
+    db = sqlite3.connect(":memory:")
+    try:
+        for name, df in tables.items():
+            prepare_output(df, text=True).to_sql(name, db, index=False)
+        # Index key columns so joins in the blog exercises stay fast
+        for name, table_spec in (schema or {}).items():
+            db.execute(f'CREATE UNIQUE INDEX "ix_{name}_{table_spec["key"]}" ON "{name}" ("{table_spec["key"]}")')
+            parent = table_spec.get("parent")
+            if parent:
+                fk = schema[parent]["key"]
+                db.execute(f'CREATE INDEX "ix_{name}_{fk}" ON "{name}" ("{fk}")')
+        db.commit()
+        return db.serialize()
+    finally:
+        db.close()
+
+def bundle_zip_parquet(tables):
+    _require("pyarrow", "Parquet export")
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, df in tables.items():
+            zf.writestr(f"{name.lower()}.parquet", prepare_output(df).to_parquet(index=False))
+    return buffer.getvalue()
+
+def export_bundle(tables, fmt, schema=None):
+    """Returns (bytes, mime, file_extension) for the chosen bundle format."""
+    if fmt not in BUNDLE_FORMATS:
+        raise ValueError(f"Unknown bundle format: {fmt}")
+    if fmt == "ZIP of CSVs":
+        data = bundle_zip_csv(tables)
+    elif fmt == "SQLite Database":
+        data = bundle_sqlite(tables, schema)
+    else:
+        data = bundle_zip_parquet(tables)
+    info = BUNDLE_FORMATS[fmt]
+    return data, info["mime"], info["ext"]
+
+# --- STREAMING EXPORT ---
+# Single-table formats that can be written chunk by chunk and concatenated.
+STREAM_FORMATS = {fmt: info["mime"] for fmt, info in TABLE_FORMATS.items() if info["stream"]}
+
+def encode_chunk(df, fmt, first=True):
+    """Encodes one chunk; only the first CSV chunk carries the header row."""
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"Unknown stream format: {fmt}")
+    return encode_table(df, fmt, header=first)
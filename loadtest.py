@@ -0,0 +1,379 @@
+"""
+Load-test harness: simulated pilots driving the real app.py and app_v1.py.
+
+Every simulated pilot is a streamlit.testing.v1.AppTest session running the
+shipped script headlessly: the login form or the ?pilot_token= handoff, the
+navigator, its Read/Code/Quiz buttons, and for some pilots the Data Studio
+form in app_v1.py. The Google Sheets connection is replaced by FakeSheets,
+an in-memory stand-in with configurable latency that counts reads and
+writes and flags writes that clobber other pilots' rows. All
+sessions run in this one process, so the app's st.cache_resource objects
+(connection, sheet cache, snapshot warmer, manifest router) are shared
+between them exactly as between sessions on one server.
+
+    python loadtest.py --users 50,200,1000 --concurrency 32
+    python loadtest.py --users 200 --json baseline.json
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_engine import GENERATION_MODES
+
+# --- SETTINGS ---
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LAUNCHPAD = os.path.join(ROOT, "app.py")
+DATA_STUDIO = os.path.join(ROOT, "app_v1.py")
+PROGRESS_ACTIONS = {"Blog_Read": "r_", "Code_Done": "c_", "Quiz_Done": "q_"}  # column -> button key prefix
+FLOWS = ["landing", "login", "pilot_token", "navigator", "toggle", "data_studio"]
+PASSWORD = "launchpad"
+LEADS_SHEET = "Leads"  # what read()/update() without a worksheet hit, like the first tab of the real sheet
+# A pilot's write may add or change only that pilot's rows; dropping or changing
+# anyone else's row means it was built on an outdated copy of the sheet
+SHEET_KEYS = {"Node_Analytics": ["Email", "Node_ID"], "User_Missions": ["Email", "Mission_ID"]}
+
+# --- BACKEND STAND-IN ---
+class FakeSheets:
+    """In-memory worksheets behind the same read/update calls the apps make on GSheetsConnection."""
+
+    def __init__(self, sheets, read_latency=0.0, write_latency=0.0):
+        self.read_latency = read_latency
+        self.write_latency = write_latency
+        self._lock = threading.Lock()
+        self._sheets = {name: df.copy() for name, df in sheets.items()}
+        self.reads = Counter()
+        self.writes = Counter()
+        self.stale_writes = Counter()
+
+    def read(self, worksheet=None):
+        worksheet = worksheet or LEADS_SHEET
+        time.sleep(self.read_latency)
+        with self._lock:
+            self.reads[worksheet] += 1
+            return self._sheets[worksheet].copy()
+
+    def update(self, worksheet=None, data=None, writer=None):
+        """`writer` is the signed-in pilot's email; their own rows are theirs to change."""
+        worksheet = worksheet or LEADS_SHEET
+        time.sleep(self.write_latency)
+        with self._lock:
+            self.writes[worksheet] += 1
+            keys = SHEET_KEYS.get(worksheet)
+            if keys and _clobbered_rows(self._sheets[worksheet], data, keys, writer):
+                self.stale_writes[worksheet] += 1
+            self._sheets[worksheet] = data.copy()
+
+    def peek(self, worksheet):
+        """Uncounted read for the end-of-run audit."""
+        with self._lock:
+            return self._sheets[worksheet].copy()
+
+def _clobbered_rows(current, incoming, keys, writer=None):
+    """Rows of `current` not owned by `writer` that `incoming` drops or changes, matched on `keys`."""
+    current = current[current["Email"] != writer] if writer else current
+    if current.empty:
+        return 0
+    cols = [c for c in current.columns if c in incoming.columns]
+    cur = current[cols].astype(str).drop_duplicates(keys, keep="last").set_index(keys)
+    new = incoming[cols].astype(str).drop_duplicates(keys, keep="last").set_index(keys)
+    kept = cur.index.isin(new.index)
+    shared = cur.index[kept]
+    changed = (cur.loc[shared] != new.loc[shared, cur.columns]).any(axis=1)
+    return int((~kept).sum() + changed.sum())
+
+def seed_sheets(n_users, n_missions=4, nodes_per_mission=5):
+    password_hash = hashlib.sha256(str.encode(PASSWORD)).hexdigest()
+    registry = pd.DataFrame({
+        "Full_Name": [f"Pilot {i}" for i in range(n_users)],
+        "Email": [f"pilot{i}@loadtest.local" for i in range(n_users)],
+        "Password_Hash": password_hash,
+        "Clearance": 1,
+    })
+    manifest = pd.DataFrame([
+        {"Mission_ID": f"M{m}", "Node_ID": f"M{m}-N{n}", "Node_Title": f"Mission {m} Lesson {n}",
+         "URL": f"https://projectaiml.com/m{m}-n{n}", "Order": n}
+        for m in range(n_missions) for n in range(1, nodes_per_mission + 1)
+    ])
+    return {
+        "User_Registry": registry,
+        "Mission_Manifest": manifest,
+        "Node_Analytics": pd.DataFrame(columns=["Email", "Mission_ID", "Node_ID"] + list(PROGRESS_ACTIONS)),
+        "User_Missions": pd.DataFrame(columns=["Email", "Mission_ID", "Current_Node", "Status", "Last_Update"]),
+        LEADS_SHEET: pd.DataFrame(columns=["Timestamp", "Email", "Industry"]),
+    }
+
+# --- WIRING THE APPS TO THE STAND-IN ---
+BACKEND = None  # the FakeSheets of the running stage
+
+def install_fake_gsheets():
+    """Registers a `streamlit_gsheets` whose connection talks to BACKEND; the apps import it lazily."""
+    import streamlit as st
+    from streamlit.connections import BaseConnection
+
+    class FakeGSheetsConnection(BaseConnection):
+        def _connect(self, **kwargs):
+            return None
+
+        def read(self, worksheet=None, ttl=None, **kwargs):
+            return BACKEND.read(worksheet)
+
+        def update(self, worksheet=None, data=None, **kwargs):
+            return BACKEND.update(worksheet, data, writer=st.session_state.get("user_email"))
+
+    module = types.ModuleType("streamlit_gsheets")
+    module.GSheetsConnection = FakeGSheetsConnection
+    sys.modules["streamlit_gsheets"] = module
+
+def share_apptest_runtime():
+    """
+    AppTest assumes one test at a time. It installs a mock Runtime for the
+    length of one run and clears it afterwards, so with sessions running
+    concurrently one run's cleanup would pull the runtime out from under
+    another; keep answering with the last mock AppTest installed. Each
+    session also compiles the script itself and ast.parse is not
+    thread-safe on every Python, so compile one at a time.
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    compile_lock = threading.Lock()
+    get_bytecode = ScriptCache.get_bytecode
+
+    def locked_get_bytecode(self, script_path):
+        with compile_lock:
+            return get_bytecode(self, script_path)
+
+    ScriptCache.get_bytecode = locked_get_bytecode
+
+    last = [None]
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[0] = cls._instance
+        if last[0] is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return cls._instance or last[0]
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or last[0] is not None)
+
+def quiet_bare_mode_warnings():
+    """
+    Sessions run without a server, which Streamlit warns about on every script
+    thread. Its loggers are reset to the configured level whenever the config
+    is parsed, so the warning is filtered out instead of silenced by level.
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    logger = logging.getLogger(get_script_run_ctx.__module__)
+    logger.addFilter(lambda record: "missing ScriptRunContext" not in record.getMessage())
+
+def reset_server(backend, snapshot_dir):
+    """A fresh 'server process' per stage: empty shared caches, own snapshot directory."""
+    global BACKEND
+    import streamlit as st
+    import snapshots
+
+    BACKEND = backend
+    snapshots.SNAPSHOT_DIR = snapshot_dir
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+# --- PILOT SESSIONS ---
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.errors = Counter()
+        self.first_error = {}
+
+    def run(self, flow, at, action=None):
+        """Times one script run; an uncaught exception or an st.error on the page counts as an error."""
+        start = time.perf_counter()
+        try:
+            (action or at).run()
+            problems = [e.value for e in at.exception] + [e.value for e in at.error]
+        except Exception as e:
+            problems = [f"{type(e).__name__}: {e}"]
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.timings[flow].append(elapsed)
+            if problems:
+                self.errors[flow] += 1
+                self.first_error.setdefault(flow, str(problems[0]))
+        return not problems
+
+    def fail(self, flow, problem):
+        with self._lock:
+            self.errors[flow] += 1
+            self.first_error.setdefault(flow, problem)
+
+def _by_label(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+def run_pilot(recorder, user_id, args, expected):
+    """One pilot's visit: sign in, open the navigator, tick a few boxes, maybe generate data."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = np.random.default_rng([args.seed, user_id])
+    email = f"pilot{user_id}@loadtest.local"
+    at = AppTest.from_file(LAUNCHPAD, default_timeout=args.timeout)
+
+    # Half arrive from a blog link carrying ?pilot_token=, half use the login form
+    if rng.random() < 0.5:
+        at.query_params["pilot_token"] = email
+        recorder.run("pilot_token", at)
+    else:
+        if not recorder.run("landing", at):
+            return
+        _by_label(at.text_input, "Email").input(email)
+        _by_label(at.text_input, "Password").input(PASSWORD)
+        recorder.run("login", at, _by_label(at.button, "Authorize").click())
+    if not at.session_state["authenticated"]:
+        return
+    recorder.run("navigator", at)
+
+    flags = {}
+    picks = rng.permutation(args.missions * args.nodes * len(PROGRESS_ACTIONS))[:args.toggles]
+    for pick in picks:
+        node, action = divmod(int(pick), len(PROGRESS_ACTIONS))
+        mission, lesson = divmod(node, args.nodes)
+        m_id, n_id = f"M{mission}", f"M{mission}-N{lesson + 1}"
+        column = list(PROGRESS_ACTIONS)[action]
+        # The button's click handler syncs the sheet, then st.rerun() redraws the navigator
+        key = f"{PROGRESS_ACTIONS[column]}{m_id}_{n_id}"
+        try:
+            button = at.button(key=key)
+        except KeyError:
+            recorder.fail("toggle", f"No {key} button on the page")
+            continue
+        if recorder.run("toggle", at, button.click()):
+            flags[(n_id, column)] = True
+        if args.think:
+            time.sleep(rng.exponential(args.think))
+    expected[email] = flags
+
+    if rng.random() < args.studio_share:
+        studio = AppTest.from_file(DATA_STUDIO, default_timeout=args.timeout)
+        studio.run()
+        _by_label(studio.selectbox, "Select Industry").select(["Insurance", "Legal"][rng.integers(2)])
+        _by_label(studio.selectbox, "Data Shape").select(GENERATION_MODES[rng.integers(len(GENERATION_MODES))])
+        _by_label(studio.slider, "Number of Rows").set_value(args.studio_rows)
+        _by_label(studio.text_input, "Enter your business email to generate & download:").input(email)
+        recorder.run("data_studio", studio, _by_label(studio.button, "Generate Data").click())
+
+def count_lost_updates(backend, expected):
+    """Acknowledged toggles that are not what the sheet holds at the end of the run."""
+    final = backend.peek("Node_Analytics")
+    final = final.drop_duplicates(["Email", "Node_ID"], keep="last").set_index(["Email", "Node_ID"])
+    lost = 0
+    for email, flags in expected.items():
+        for (node_id, column), value in flags.items():
+            key = (email, node_id)
+            actual = bool(final.at[key, column]) if key in final.index else False
+            lost += actual != value
+    return lost
+
+# --- STAGES & REPORT ---
+def run_stage(n_users, args):
+    backend = FakeSheets(seed_sheets(n_users, args.missions, args.nodes),
+                         read_latency=args.read_ms / 1000, write_latency=args.write_ms / 1000)
+    recorder = Recorder()
+    expected = {}
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-snapshots-") as snapshot_dir:
+        reset_server(backend, snapshot_dir)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for future in [pool.submit(run_pilot, recorder, uid, args, expected) for uid in range(n_users)]:
+                future.result()
+        wall = time.perf_counter() - start
+
+    flows = {}
+    for flow in FLOWS:
+        samples = np.asarray(recorder.timings.get(flow, [])) * 1000
+        if samples.size:
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            flows[flow] = {"count": int(samples.size), "errors": recorder.errors[flow],
+                           "p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "p99_ms": round(p99, 2)}
+    return {
+        "users": n_users, "wall_s": round(wall, 2), "pilots_per_s": round(n_users / wall, 1),
+        "flows": flows, "reads": dict(backend.reads), "writes": dict(backend.writes),
+        "stale_writes": dict(backend.stale_writes), "lost_updates": count_lost_updates(backend, expected),
+        "first_errors": recorder.first_error,
+    }
+
+def print_stage(stage):
+    print(f"\n=== {stage['users']} pilots | {stage['wall_s']}s | {stage['pilots_per_s']} pilots/s ===")
+    print(pd.DataFrame.from_dict(stage["flows"], orient="index").to_string())
+    print(f"backend reads:  {stage['reads']}")
+    print(f"backend writes: {stage['writes']}")
+    print(f"stale writes:   {stage['stale_writes']}")
+    print(f"lost updates:   {stage['lost_updates']}")
+    for flow, error in stage["first_errors"].items():
+        print(f"first {flow} error: {error}")
+
+def print_curve(stages):
+    rows = [{"users": s["users"], "pilots_per_s": s["pilots_per_s"],
+             **{f"{flow}_p95_ms": s["flows"][flow]["p95_ms"] for flow in ("navigator", "toggle") if flow in s["flows"]},
+             "reads": sum(s["reads"].values()), "writes": sum(s["writes"].values()),
+             "lost_updates": s["lost_updates"]} for s in stages]
+    print("\n=== Scaling curve ===")
+    print(pd.DataFrame(rows).to_string(index=False))
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive app.py and app_v1.py with simulated pilots against an in-memory sheet backend")
+    parser.add_argument("--users", default="50,200", help="Comma-separated pilot counts, one stage each")
+    parser.add_argument("--concurrency", type=int, default=16, help="Pilots in flight at once (server threads)")
+    parser.add_argument("--read-ms", type=float, default=5, help="Simulated sheet read latency")
+    parser.add_argument("--write-ms", type=float, default=10, help="Simulated sheet write latency")
+    parser.add_argument("--toggles", type=int, default=3, help="Progress toggles per pilot")
+    parser.add_argument("--think", type=float, default=0, help="Mean think time between toggles, seconds")
+    parser.add_argument("--missions", type=int, default=4)
+    parser.add_argument("--nodes", type=int, default=5, help="Nodes per mission")
+    parser.add_argument("--studio-share", type=float, default=0.1, help="Share of pilots that also use the Data Studio")
+    parser.add_argument("--studio-rows", type=int, default=100, help="Data Studio rows (its slider allows 10-500)")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds one script run may take")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        user_counts = [int(n) for n in args.users.split(",") if n.strip()]
+    except ValueError:
+        parser.error("--users must be comma-separated integers")
+    if not 10 <= args.studio_rows <= 500:
+        parser.error("--studio-rows must be between 10 and 500")
+    try:
+        quiet_bare_mode_warnings()
+        install_fake_gsheets()
+        share_apptest_runtime()
+    except ImportError:
+        parser.error("the load test runs the real apps and needs streamlit installed")
+
+    stages = []
+    for n_users in user_counts:
+        stages.append(run_stage(n_users, args))
+        print_stage(stages[-1])
+    if len(stages) > 1:
+        print_curve(stages)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"settings": vars(args), "stages": stages}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Precompiled mission content router.
+
+The Mission_Manifest sheet (or the hard-coded MISSION_CONTENT map in
+app_v1.py) is compiled once into a ManifestIndex: mission -> ordered node
+tuples, (mission, node) -> node, plus position, next-node and total-node
+lookups. The index is immutable and stamped with a hash of the manifest
+content. ManifestRouter keeps the current index per process and only
+recompiles when that hash changes, so renders never slice DataFrames.
+"""
+import hashlib
+import json
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+# Position is 1-based within the mission, the same numbering as Current_Node in User_Missions
+Node = namedtuple("Node", ["mission_id", "node_id", "title", "url", "order", "position"])
+
+MANIFEST_COLUMNS = ["Mission_ID", "Node_ID", "Node_Title", "URL", "Order"]
+
+class ManifestIndex:
+    """Read-only lookups over one version of the manifest."""
+
+    __slots__ = ("version", "_missions", "_nodes")
+
+    def __init__(self, rows, version):
+        """`rows` are (mission_id, node_id, title, url, order) in manifest order."""
+        grouped = {}
+        for m_id, n_id, title, url, order in rows:
+            grouped.setdefault(str(m_id), []).append((str(n_id), str(title), str(url), float(order)))
+
+        missions, nodes = {}, {}
+        for m_id, entries in grouped.items():
+            # Stable sort: nodes sharing an Order keep their manifest order
+            entries.sort(key=lambda entry: entry[3])
+            ordered = tuple(Node(m_id, n_id, title, url, order, pos)
+                            for pos, (n_id, title, url, order) in enumerate(entries, start=1))
+            missions[m_id] = ordered
+            for node in ordered:
+                nodes.setdefault((m_id, node.node_id), node)
+
+        self.version = version
+        self._missions = MappingProxyType(missions)
+        self._nodes = MappingProxyType(nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def missions(self):
+        """Mission IDs in the order they first appear in the manifest."""
+        return tuple(self._missions)
+
+    def nodes(self, mission_id):
+        return self._missions.get(str(mission_id), ())
+
+    def total_nodes(self, mission_id):
+        return len(self.nodes(mission_id))
+
+    def node(self, mission_id, node_id):
+        return self._nodes.get((str(mission_id), str(node_id)))
+
+    def node_at(self, mission_id, position):
+        """The node at 1-based `position`, or None past either end."""
+        nodes = self.nodes(mission_id)
+        position = int(position)
+        return nodes[position - 1] if 1 <= position <= len(nodes) else None
+
+    def next_node(self, mission_id, node_id):
+        node = self.node(mission_id, node_id)
+        return self.node_at(mission_id, node.position + 1) if node else None
+
+EMPTY_INDEX = ManifestIndex((), version="")
+
+# --- VERSIONING ---
+def frame_version(manifest):
+    """Content hash of a Mission_Manifest frame (row order matters, the index does not)."""
+    pd = _pandas()
+    cols = [c for c in MANIFEST_COLUMNS if c in manifest.columns]
+    digest = hashlib.sha1(",".join(cols).encode())
+    digest.update(pd.util.hash_pandas_object(manifest[cols].astype(str), index=False).values.tobytes())
+    return digest.hexdigest()[:12]
+
+def rows_version(rows):
+    return hashlib.sha1(json.dumps([list(r) for r in rows], default=str).encode()).hexdigest()[:12]
+
+def manifest_rows(manifest):
+    """Pulls (mission, node, title, url, order) rows out of a Mission_Manifest frame."""
+    if manifest.empty or not set(MANIFEST_COLUMNS[:2]).issubset(manifest.columns):
+        return []
+    pd = _pandas()
+    n = len(manifest)
+    column = lambda name: manifest[name].astype(str).tolist() if name in manifest.columns else [""] * n
+    order = (pd.to_numeric(manifest['Order'], errors='coerce').fillna(0).tolist()
+             if 'Order' in manifest.columns else list(range(n)))
+    return list(zip(column('Mission_ID'), column('Node_ID'), column('Node_Title'), column('URL'), order))
+
+def mapping_rows(content):
+    """Rows for a {mission: {position: url}} map such as MISSION_CONTENT."""
+    return [(m_id, pos, f"Node {pos:02d}", url, pos)
+            for m_id, urls in content.items() for pos, url in sorted(urls.items())]
+
+def _pandas():
+    import pandas as pd
+    return pd
+
+# --- ROUTER ---
+class ManifestRouter:
+    """Per-process holder of the current index; share one through st.cache_resource."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = EMPTY_INDEX
+        self._last_frame = (None, EMPTY_INDEX)  # (frame object, index compiled from it)
+        self.compiles = 0
+        self.hashes = 0
+
+    @property
+    def index(self):
+        return self._index
+
+    def from_frame(self, manifest):
+        """
+        Index for a cached manifest frame. The sheet cache hands out the same
+        object until it reloads, so the content is only hashed for a new
+        object; callers must not modify the frame they pass in.
+        """
+        frame, index = self._last_frame
+        if frame is manifest:
+            return index
+        self.hashes += 1
+        index = self._resolve(frame_version(manifest), lambda: manifest_rows(manifest))
+        self._last_frame = (manifest, index)
+        return index
+
+    def from_rows(self, rows):
+        return self._resolve(rows_version(rows), lambda: rows)
+
+    def from_mapping(self, content):
+        rows = mapping_rows(content)
+        return self._resolve(rows_version(rows), lambda: rows)
+
+    def _resolve(self, version, load_rows):
+        index = self._index
+        if index.version == version:
+            return index
+        with self._lock:
+            # Another session may have compiled this version while we waited
+            if self._index.version != version:
+                self._index = ManifestIndex(load_rows(), version)
+                self.compiles += 1
+            return self._index
@@ -0,0 +1,127 @@
+"""
+Request coalescing for worksheet reads.
+
+SingleFlight makes concurrent callers for the same key share one in-flight
+call. SWRCache builds on it: fresh entries are served from memory, stale
+entries are served immediately while one background refresh runs, and only
+a true miss blocks, with every session waiting on the same fetch.
+Sheet reads per refresh go from one per active session to one per process.
+"""
+import threading
+import time
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Runs at most one fn() per key at a time; concurrent callers get its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+class SWRCache:
+    """
+    Stale-while-revalidate cache around `load(key)`.
+
+    Entries younger than `fresh_for` seconds are returned as-is. Older ones
+    are still returned, but trigger a single background reload; after
+    `fresh_for + stale_for` seconds (if set) an entry is too old to serve and
+    callers wait on a coalesced reload instead. A put() while a reload is
+    in flight wins: the reload's older value is not stored.
+    """
+
+    def __init__(self, load, fresh_for=300, stale_for=None):
+        self.load = load
+        self.fresh_for = fresh_for
+        self.stale_for = stale_for
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (value, loaded_at)
+        self._generations = {}  # key -> number of put() calls, to spot loads a write overtook
+        self._refreshing = set()
+        self.stats = {"hits": 0, "stale_hits": 0, "loads": 0, "coalesced": 0}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[1]
+            if age < self.fresh_for:
+                self.stats["hits"] += 1
+                return entry[0]
+            if self.stale_for is None or age < self.fresh_for + self.stale_for:
+                self.stats["stale_hits"] += 1
+                self._revalidate(key)
+                return entry[0]
+        return self._flight.do(key, lambda: self._load(key))
+
+    def put(self, key, value):
+        """Write-through: our own writes become the fresh value immediately."""
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._entries[key] = (value, time.monotonic())
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _load(self, key):
+        with self._lock:
+            generation = self._generations.get(key, 0)
+        self.stats["loads"] += 1
+        value = self.load(key)
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                self._entries[key] = (value, time.monotonic())
+            elif key in self._entries:
+                # Read before one of our writes landed; the written value is newer
+                value = self._entries[key][0]
+        return value
+
+    def _revalidate(self, key):
+        with self._lock:
+            if key in self._refreshing:
+                self.stats["coalesced"] += 1
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._flight.do(key, lambda: self._load(key))
+            except Exception:
+                pass  # keep serving the stale value; the next get() retries
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True, name=f"swr-refresh-{key}").start()
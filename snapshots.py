@@ -0,0 +1,138 @@
+"""
+On-disk Arrow IPC snapshots of the worksheets.
+
+Every live sheet read is written to SNAPSHOT_DIR as an uncompressed Arrow
+file. A fresh worker process memory-maps those files on its first request
+per worksheet and serves them straight away, while a single background read
+brings the data up to date. After a deploy or scale-out the new processes
+start warm instead of all hitting the sheet backend at once.
+"""
+import os
+import threading
+import time
+
+from startup import timed_import
+
+SNAPSHOT_DIR = os.environ.get(
+    "PROJECTAIML_SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".snapshots")
+)
+SNAPSHOT_MAX_AGE = 24 * 3600  # older snapshots are ignored and the sheet is read directly
+# Never written to disk: the registry holds password hashes
+SNAPSHOT_EXCLUDE = {"User_Registry"}
+
+def snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, f"{name}.arrow")
+
+def _to_arrow(df):
+    pa = timed_import("pyarrow")
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    # Sheets often mix numbers and text in one column (e.g. Node_ID). Store only
+    # the columns Arrow rejects as nullable text; bool columns with blanks and
+    # everything else keep their types, so missing stays missing.
+    mixed = {}
+    for col in df.columns:
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            mixed[col] = "string"
+    return pa.Table.from_pandas(df.astype(mixed), preserve_index=False)
+
+def save_snapshot(name, df):
+    """Atomically replaces the snapshot for `name`. Returns False if it could not be written."""
+    path = snapshot_path(name)
+    if name in SNAPSHOT_EXCLUDE:
+        # Also clear out a copy written before the worksheet was excluded
+        if os.path.exists(path):
+            os.remove(path)
+        return False
+    feather = timed_import("pyarrow.feather")
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(SNAPSHOT_DIR, mode=0o700, exist_ok=True)
+        # Uncompressed so readers can memory-map the buffers without decoding
+        feather.write_feather(_to_arrow(df), tmp, compression="uncompressed")
+        os.chmod(tmp, 0o600)  # only the app's own user can read sheet contents
+        os.replace(tmp, path)
+        return True
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+
+def load_snapshot(name, max_age=SNAPSHOT_MAX_AGE):
+    """Memory-maps the snapshot for `name`; returns a DataFrame or None."""
+    if name in SNAPSHOT_EXCLUDE:
+        return None
+    path = snapshot_path(name)
+    try:
+        if max_age is not None and time.time() - os.path.getmtime(path) > max_age:
+            return None
+        table = timed_import("pyarrow.feather").read_table(path, memory_map=True)
+        return table.to_pandas()
+    except Exception:
+        return None
+
+class SnapshotWarmer:
+    """
+    Process-wide front for worksheet reads.
+
+    The first get() of a worksheet in this process returns its snapshot (if
+    one exists) and starts one background fetch; the next get() hands over
+    that fetched frame. From then on every get() is a live read that also
+    refreshes the snapshot. `fetch(name)` reads the live sheet and
+    `on_refresh(name)` is called once background data is ready. A store()
+    while the background fetch runs supersedes it: its older frame is dropped.
+    """
+
+    def __init__(self, fetch, on_refresh=None, max_age=SNAPSHOT_MAX_AGE):
+        self.fetch = fetch
+        self.on_refresh = on_refresh
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._seen = set()
+        self._prefetched = {}
+        self._generations = {}  # bumped by store(), so a refresh can tell it was overtaken
+
+    def get(self, name):
+        with self._lock:
+            if name in self._prefetched:
+                return self._prefetched.pop(name)
+            first_use = name not in self._seen
+            self._seen.add(name)
+
+        if first_use:
+            warm = load_snapshot(name, self.max_age)
+            if warm is not None:
+                threading.Thread(target=self._refresh, args=(name,), daemon=True,
+                                 name=f"snapshot-refresh-{name}").start()
+                return warm
+
+        df = self.fetch(name)
+        save_snapshot(name, df)
+        return df
+
+    def store(self, name, df):
+        """Write-through after a sheet update, so snapshots never lag our own writes."""
+        with self._lock:
+            self._prefetched.pop(name, None)
+            self._generations[name] = self._generations.get(name, 0) + 1
+        save_snapshot(name, df)
+
+    def _refresh(self, name):
+        with self._lock:
+            generation = self._generations.get(name, 0)
+        try:
+            df = self.fetch(name)
+        except Exception:
+            return  # keep serving the snapshot; the next live read will retry
+        with self._lock:
+            if self._generations.get(name, 0) != generation:
+                return  # read before a write of ours landed; the written frame is newer
+            # Saved under the lock so a store() that follows always writes the file last
+            save_snapshot(name, df)
+            self._prefetched[name] = df
+        if self.on_refresh is not None:
+            self.on_refresh(name)
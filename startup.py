@@ -0,0 +1,104 @@
+"""
+Cold-start helpers: heavy modules are imported on first use through
+timed_import, which also records what each import cost this process.
+The imports an app still makes up front go inside `with eager_imports():`
+so they show up in the same report, next to the time from process start
+to the first finished render. Append ?debug=startup to an app URL to see it.
+"""
+import builtins
+import contextlib
+import importlib
+import os
+import sys
+import threading
+import time
+
+def _process_start():
+    """When the OS started this process (Linux), else when this module was imported."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rpartition(")")[2].split()[19])
+        with open("/proc/stat") as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+        return boot_time + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, StopIteration, AttributeError):
+        return time.time()
+
+PROCESS_START = _process_start()
+FIRST_SCRIPT_RUN = time.time()  # the first app script imports this module
+FIRST_RENDER = None  # set when the first page finishes drawing
+IMPORT_TIMINGS = {}  # module name -> seconds, or None if it was already loaded
+_EAGER_LOCK = threading.Lock()
+
+def timed_import(name):
+    """Imports `name` on first use and records the wall time it took."""
+    # Always go through import_module: a module can already be in sys.modules
+    # while another thread is still executing it, and only the import lock waits
+    preloaded = name in sys.modules
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    if preloaded:
+        IMPORT_TIMINGS.setdefault(name, None)
+    else:
+        IMPORT_TIMINGS[name] = time.perf_counter() - start
+    return module
+
+@contextlib.contextmanager
+def eager_imports():
+    """
+    Times every top-level module first imported by import statements in the
+    block. A nested import is counted in the module that pulled it in. Only
+    one block at a time is timed; a concurrent first run just imports.
+    """
+    if not _EAGER_LOCK.acquire(blocking=False):
+        yield
+        return
+    original = builtins.__import__
+    owner = threading.get_ident()
+    depth = [0]
+
+    def timed(name, globals=None, locals=None, fromlist=(), level=0):
+        top = name.partition(".")[0]
+        if depth[0] or level or threading.get_ident() != owner:
+            return original(name, globals, locals, fromlist, level)
+        if top in sys.modules:
+            IMPORT_TIMINGS.setdefault(top, None)
+            return original(name, globals, locals, fromlist, level)
+        depth[0] += 1
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            depth[0] -= 1
+            IMPORT_TIMINGS[top] = time.perf_counter() - start
+
+    builtins.__import__ = timed
+    try:
+        yield
+    finally:
+        builtins.__import__ = original
+        _EAGER_LOCK.release()
+
+def startup_report():
+    """Returns [{"Module", "Import_ms"}] sorted by cost, preloaded modules last."""
+    rows = [
+        {"Module": name, "Import_ms": None if secs is None else round(secs * 1000, 1)}
+        for name, secs in IMPORT_TIMINGS.items()
+    ]
+    return sorted(rows, key=lambda r: -1 if r["Import_ms"] is None else r["Import_ms"], reverse=True)
+
+def render_startup_report():
+    """Call as the last thing a page draws; it also marks the first finished render."""
+    global FIRST_RENDER
+    import streamlit as st
+
+    if FIRST_RENDER is None:
+        FIRST_RENDER = time.time()
+    if st.query_params.get("debug") != "startup":
+        return
+    with st.expander("⏱️ Startup Report", expanded=True):
+        st.caption(f"Process up for {time.time() - PROCESS_START:,.1f}s. "
+                   f"Server boot took {FIRST_SCRIPT_RUN - PROCESS_START:,.2f}s and the first page "
+                   f"finished {FIRST_RENDER - PROCESS_START:,.2f}s after process start. "
+                   "Import_ms is empty for modules that were loaded before first use.")
+        st.dataframe(startup_report(), use_container_width=True, hide_index=True)
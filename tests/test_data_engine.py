@@ -0,0 +1,29 @@
+import copy
+
+import pytest
+
+from data_engine import CORRELATION_SPECS, generate_domain_data, generate_related_tables
+
+def _insurance_with_travel():
+    spec = copy.deepcopy(CORRELATION_SPECS["Insurance"])
+    spec["Policy_Type"]["choices"].append("Travel")
+    spec["Policy_Type"]["weights"].append(0.10)
+    return spec
+
+def test_correlated_specs_generate_complete_columns():
+    df = generate_domain_data("Insurance", 2000, mode="Correlated", seed=7)
+    assert df["Status"].notna().all()
+    assert (df["Claim_Amount"] >= 500).all()
+    tables = generate_related_tables("Legal", 20, seed=7)
+    assert tables["Cases"]["Case_Type"].notna().all()
+
+def test_amount_median_must_cover_given_column():
+    spec = _insurance_with_travel()
+    spec["Status"]["weights"]["Travel"] = [0.6, 0.3, 0.1]
+    with pytest.raises(ValueError, match="median for: Travel"):
+        generate_domain_data("Insurance", 100, mode="Correlated", seed=1, spec=spec)
+
+def test_conditional_weights_must_cover_given_column():
+    spec = _insurance_with_travel()
+    with pytest.raises(ValueError, match="weights for: Travel"):
+        generate_domain_data("Insurance", 100, mode="Correlated", seed=1, spec=spec)
@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+from singleflight import SingleFlight, SWRCache
+
+def _join(prefix):
+    for thread in threading.enumerate():
+        if thread.name.startswith(prefix):
+            thread.join(5)
+
+def _run_all(fns):
+    results = [None] * len(fns)
+    def run(i, fn):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+    threads = [threading.Thread(target=run, args=(i, fn)) for i, fn in enumerate(fns)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+class BlockingLoad:
+    """load(key) that reads `value` when called, then waits until released."""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, key):
+        self.calls += 1
+        value = self.value
+        self.started.set()
+        assert self.release.wait(5)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+def test_concurrent_callers_share_one_call():
+    flight, load = SingleFlight(), BlockingLoad("sheet")
+    threads, results = _run_all([lambda: flight.do("k", lambda: load("k"))] * 8)
+    assert load.started.wait(5)
+    load.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["sheet"] * 8
+    assert load.calls == 1
+
+def test_error_reaches_every_waiter_and_is_not_cached():
+    flight, load = SingleFlight(), BlockingLoad(RuntimeError("quota"))
+    threads, results = _run_all([lambda: flight.do("k", lambda: load("k"))] * 4)
+    assert load.started.wait(5)
+    load.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.do("k", lambda: "retried") == "retried"
+
+def test_misses_coalesce_into_one_load():
+    load = BlockingLoad("sheet")
+    cache = SWRCache(load)
+    threads, results = _run_all([lambda: cache.get("Node_Analytics")] * 6)
+    assert load.started.wait(5)
+    load.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["sheet"] * 6
+    assert cache.stats["loads"] == 1
+    assert cache.get("Node_Analytics") == "sheet"
+    assert cache.stats["hits"] == 1
+
+def test_miss_error_propagates():
+    load = BlockingLoad(RuntimeError("quota"))
+    load.release.set()
+    with pytest.raises(RuntimeError, match="quota"):
+        SWRCache(load).get("Node_Analytics")
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    load = BlockingLoad(2)
+    cache = SWRCache(load, fresh_for=0)
+    cache.put("k", 1)
+    assert cache.get("k") == 1
+    assert cache.get("k") == 1
+    assert load.started.wait(5)
+    load.release.set()
+    _join("swr-refresh-")
+    assert load.calls == 1
+    assert cache.stats["coalesced"] >= 1
+    assert cache.get("k") == 2
+
+def test_write_during_refresh_is_not_overwritten():
+    load = BlockingLoad(1)  # the refresh reads the sheet before our write lands
+    cache = SWRCache(load, fresh_for=0)
+    cache.put("k", 1)
+    assert cache.get("k") == 1
+    assert load.started.wait(5)
+
+    cache.put("k", 2)
+    load.release.set()
+    _join("swr-refresh-")
+
+    cache.fresh_for = 300
+    assert cache.get("k") == 2
+
+def test_write_during_miss_is_returned_to_the_waiter():
+    load = BlockingLoad(1)
+    cache = SWRCache(load)
+    threads, results = _run_all([lambda: cache.get("k")])
+    assert load.started.wait(5)
+    cache.put("k", 2)
+    load.release.set()
+    threads[0].join(5)
+    assert results == [2]
+    assert cache.get("k") == 2
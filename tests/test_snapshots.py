@@ -0,0 +1,68 @@
+import os
+import stat
+import threading
+
+import pandas as pd
+import pytest
+
+import snapshots
+
+pytest.importorskip("pyarrow")
+
+@pytest.fixture(autouse=True)
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", str(tmp_path))
+    return tmp_path
+
+def test_mixed_node_id_keeps_nullable_bools():
+    df = pd.DataFrame({
+        "Email": ["a@x.io", "b@x.io", "c@x.io"],
+        "Node_ID": [1, "N-2", 3],
+        "Blog_Read": [False, True, None],
+    })
+    assert snapshots.save_snapshot("Node_Analytics", df)
+
+    loaded = snapshots.load_snapshot("Node_Analytics")
+    assert loaded["Node_ID"].tolist() == ["1", "N-2", "3"]
+    assert loaded["Blog_Read"].tolist() == [False, True, None]
+    # What app.py's get_data does with it
+    assert loaded["Blog_Read"].fillna(False).astype(bool).tolist() == [False, True, False]
+
+def test_missing_text_stays_missing():
+    df = pd.DataFrame({"Node_ID": [1, "N-2", None]})
+    assert snapshots.save_snapshot("Mission_Manifest", df)
+    assert snapshots.load_snapshot("Mission_Manifest")["Node_ID"].isna().tolist() == [False, False, True]
+
+def test_registry_is_never_written(snapshot_dir):
+    registry = pd.DataFrame({"Email": ["a@x.io"], "Password_Hash": ["deadbeef"]})
+    assert not snapshots.save_snapshot("User_Registry", registry)
+    assert not os.path.exists(snapshots.snapshot_path("User_Registry"))
+    assert snapshots.load_snapshot("User_Registry") is None
+
+def test_snapshot_is_owner_only():
+    snapshots.save_snapshot("Node_Analytics", pd.DataFrame({"Blog_Read": [True]}))
+    mode = stat.S_IMODE(os.stat(snapshots.snapshot_path("Node_Analytics")).st_mode)
+    assert mode == 0o600
+
+def test_store_supersedes_an_inflight_refresh():
+    stale = pd.DataFrame({"Blog_Read": [False]})
+    written = pd.DataFrame({"Blog_Read": [True]})
+    snapshots.save_snapshot("Node_Analytics", stale)
+
+    release = threading.Event()
+    def fetch(name):
+        release.wait(5)
+        return stale  # what the sheet held when the refresh started reading
+    refreshed = []
+    warmer = snapshots.SnapshotWarmer(fetch, on_refresh=refreshed.append)
+
+    assert warmer.get("Node_Analytics")["Blog_Read"].tolist() == [False]
+    warmer.store("Node_Analytics", written)
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name == "snapshot-refresh-Node_Analytics":
+            thread.join(5)
+
+    assert refreshed == []
+    assert snapshots.load_snapshot("Node_Analytics")["Blog_Read"].tolist() == [True]
+    assert "Node_Analytics" not in warmer._prefetched
@@ -0,0 +1,66 @@
+import hashlib
+
+import pandas as pd
+import pytest
+
+import user_import
+from user_import import hash_passwords, prepare_bulk_import
+
+REGISTRY = pd.DataFrame({"Full_Name": ["Known"], "Email": ["Known@x.io"]})
+
+def _upload(rows, **extra):
+    frame = pd.DataFrame(rows, columns=["Full_Name", "Email", "Password"])
+    for name, values in extra.items():
+        frame[name] = values
+    return frame
+
+def test_checks_run_in_order_and_keep_first_valid_duplicate():
+    upload = _upload([
+        ["", "known@x.io", "pw"],            # missing wins over registered
+        ["Bob", "not-an-email", "pw"],
+        ["Known", " KNOWN@x.io ", "pw"],
+        ["Fay", "fay@x.io", "  "],           # missing password, so not the first occurrence
+        ["Fay", "FAY@x.io", "pw"],
+        ["Fay again", "fay@x.io", "pw"],
+        ["Known again", "known@x.io", "pw"], # registered wins over duplicate
+    ])
+    new_rows, report = prepare_bulk_import(upload, REGISTRY)
+
+    assert report["Row"].tolist() == [2, 3, 4, 5, 6, 7, 8]
+    assert report["Result"].tolist() == ["Rejected", "Rejected", "Skipped", "Rejected",
+                                         "Created", "Skipped", "Skipped"]
+    assert report["Detail"].tolist() == [
+        "Missing name, email or password",
+        "Invalid email address",
+        "Already registered",
+        "Missing name, email or password",
+        "",
+        "Duplicate email in file",
+        "Already registered",
+    ]
+    assert new_rows["Email"].tolist() == ["fay@x.io"]
+    assert new_rows["Full_Name"].tolist() == ["Fay"]
+
+def test_missing_required_column_is_rejected():
+    with pytest.raises(ValueError, match="Password"):
+        prepare_bulk_import(pd.DataFrame({"Full_Name": ["A"], "Email": ["a@x.io"]}), REGISTRY)
+
+def test_clearance_is_capped_by_the_importer():
+    rows = [[f"P{i}", f"p{i}@x.io", "pw"] for i in range(5)]
+    clearance = [9, 0, "abc", 3, None]
+
+    new_rows, _ = prepare_bulk_import(_upload(rows, Clearance=clearance), REGISTRY)
+    assert new_rows["Clearance"].tolist() == [1, 1, 1, 1, 1]
+
+    new_rows, _ = prepare_bulk_import(_upload(rows, Clearance=clearance), REGISTRY, max_clearance=3)
+    assert new_rows["Clearance"].tolist() == [3, 1, 1, 3, 1]
+
+def test_chunked_hashes_keep_input_order(monkeypatch):
+    monkeypatch.setattr(user_import, "HASH_CHUNK", 3)
+    passwords = [f"secret-{i}" for i in range(10)]
+    expected = [hashlib.sha256(p.encode()).hexdigest() for p in passwords]
+    assert hash_passwords(passwords, workers=4) == expected
+
+    upload = _upload([[f"P{i}", f"p{i}@x.io", p] for i, p in enumerate(passwords)])
+    new_rows, _ = prepare_bulk_import(upload, REGISTRY, workers=4)
+    assert new_rows["Password_Hash"].tolist() == expected
@@ -0,0 +1,96 @@
+"""
+Bulk pilot provisioning for the User_Registry worksheet.
+
+A CSV of new pilots is validated and deduplicated in memory against a set
+of registry emails, passwords are hashed on a worker pool, and the caller
+commits everything with a single sheet write.
+"""
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+REQUIRED_COLUMNS = ["Full_Name", "Email", "Password"]
+HASH_WORKERS = 8
+HASH_CHUNK = 500
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+ADMIN_CLEARANCE = 5  # pilots at this level may bulk-import others
+
+def hash_password(password):
+    return hashlib.sha256(str.encode(password)).hexdigest()
+
+def _hash_chunk(passwords):
+    return [hash_password(p) for p in passwords]
+
+def hash_passwords(passwords, workers=HASH_WORKERS):
+    """Hashes in chunks on a thread pool; order of the result matches the input."""
+    chunks = [passwords[i:i + HASH_CHUNK] for i in range(0, len(passwords), HASH_CHUNK)]
+    if len(chunks) <= 1:
+        return _hash_chunk(passwords)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return [h for chunk in pool.map(_hash_chunk, chunks) for h in chunk]
+
+def normalize_emails(emails):
+    return emails.astype(str).str.strip().str.lower()
+
+def prepare_bulk_import(upload, registry, workers=HASH_WORKERS, max_clearance=1):
+    """
+    Checks an uploaded frame of pilots against the current registry.
+
+    An optional Clearance column is clamped to 1..max_clearance, so an
+    importer can never grant more than the caller allows (by default, 1).
+    Returns (new_rows, report). new_rows has the User_Registry columns and is
+    ready to append; report has one line per input row with its outcome.
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in upload.columns]
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+
+    users = upload.copy()
+    users["Full_Name"] = users["Full_Name"].fillna("").astype(str).str.strip()
+    users["Password"] = users["Password"].fillna("").astype(str)
+    users["Email"] = normalize_emails(users["Email"].fillna(""))
+
+    # Hashed index of who is already registered: O(1) membership per row
+    existing = set()
+    if not registry.empty and "Email" in registry.columns:
+        existing = set(normalize_emails(registry["Email"].dropna()))
+
+    result = pd.Series("Created", index=users.index)
+    detail = pd.Series("", index=users.index)
+    checks = [
+        (lambda u: (u["Full_Name"] == "") | (u["Email"] == "") | (u["Password"].str.strip() == ""),
+         "Rejected", "Missing name, email or password"),
+        (lambda u: ~u["Email"].str.match(EMAIL_PATTERN), "Rejected", "Invalid email address"),
+        (lambda u: u["Email"].isin(existing), "Skipped", "Already registered"),
+        (lambda u: u["Email"].duplicated(keep="first"), "Skipped", "Duplicate email in file"),
+    ]
+    # Each check only sees rows that passed the previous ones, so the first
+    # valid occurrence of a duplicated email is the one that gets created
+    for check, outcome, reason in checks:
+        pending = users[result == "Created"]
+        failed = pending.index[check(pending)]
+        result[failed] = outcome
+        detail[failed] = reason
+
+    accepted = users[result == "Created"]
+    clearance = 1
+    if "Clearance" in accepted.columns:
+        clearance = (pd.to_numeric(accepted["Clearance"], errors="coerce").fillna(1)
+                     .clip(1, max(int(max_clearance), 1)).astype(int))
+
+    new_rows = pd.DataFrame({
+        "Full_Name": accepted["Full_Name"],
+        "Email": accepted["Email"],
+        "Password_Hash": hash_passwords(accepted["Password"].tolist(), workers),
+        "Clearance": clearance,
+        "Join_Date": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }, index=accepted.index)
+
+    report = pd.DataFrame({
+        "Row": range(2, len(users) + 2),   # spreadsheet line numbers, after the header
+        "Email": users["Email"],
+        "Result": result,
+        "Detail": detail,
+    })
+    return new_rows.reset_index(drop=True), report.reset_index(drop=True)